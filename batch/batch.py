@@ -0,0 +1,192 @@
+# build catalog variants without a document or the GUI, one process per core
+#   python -m batch.batch variants.csv --output out --format step --format stl
+#   FreeCADCmd batch/batch.py variants.csv
+# the table has a row per variant, a generator and name column and the
+# generator properties as columns, either as named in FreeCAD or snake case
+#   generator,name,Teeth,Module,ProfileShiftFactor
+#   gear,g20m2,20,2,0
+import argparse
+import csv
+import importlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# imported when a variant needs them
+SHAPES = {
+    "gear": ("gear.gear", "gear_shape"),
+    "sprocket": ("sprocket.sprocket", "sprocket_shape"),
+    "cycloid": ("cycloid.cycloid", "cycloid_shape"),
+    "cycloid_drive": ("cycloid.drive", "drive_shape"),
+    "tube": ("tube.tube", "tube_shape"),
+    "tube_set": ("tube.cutlist", "tube_set_shape"),
+    "rack": ("rack.rack", "rack_shape"),
+    "worm": ("worm.worm", "worm_shape"),
+}
+
+FORMATS = ["brep", "step", "stl", "3mf"]
+
+# formats written from the sampled profile without building the solid
+MESH_FORMATS = ["stl", "3mf"]
+
+
+def keyword(column):
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", column.strip()).lower()
+
+
+def parse_value(text):
+    text = text.strip()
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def read_table(path):
+    with open(path, newline="") as file:
+        if path.endswith(".json"):
+            return json.load(file)
+        return [
+            {column: parse_value(value) for column, value in row.items() if value}
+            for row in csv.DictReader(file)
+        ]
+
+
+def variants(rows, generator=None):
+    for index, row in enumerate(rows):
+        row = {keyword(column): value for column, value in row.items()}
+        kind = row.pop("generator", generator)
+        name = str(row.pop("name", "{}_{:04d}".format(kind, index)))
+        # exports are always built at the full level of detail, the default
+        # of the shape functions
+        row.pop("level_of_detail", None)
+        yield kind, name, row
+
+
+def export(shape, path, format):
+    if format == "brep":
+        shape.exportBrep(path)
+    elif format == "step":
+        shape.exportStep(path)
+    else:
+        shape.exportStl(path)
+
+
+def shape_function(kind):
+    module, name = SHAPES[kind]
+    return getattr(importlib.import_module(module), name)
+
+
+def from_mesh(format, mesh):
+    return format in MESH_FORMATS and (mesh or format == "3mf")
+
+
+def mesh_module():
+    return importlib.import_module("kernel.mesh")
+
+
+def build_variant(job):
+    kind, name, params, formats, directory, mesh = job
+
+    result = {"generator": kind, "name": name, "params": params}
+    start = time.perf_counter()
+    try:
+        files = []
+        for format in formats:
+            path = os.path.join(directory, name + "." + format)
+            if from_mesh(format, mesh):
+                if "triangles" not in result:
+                    vertices, triangles = mesh_module().MESHES[kind](**params)
+                    result["triangles"] = len(triangles)
+                mesh_module().write_mesh(path, vertices, triangles, format)
+            else:
+                if "outputs" not in result:
+                    shape, outputs = shape_function(kind)(**params)
+                    result.update(outputs=outputs, valid=shape.isValid())
+                export(shape, path, format)
+            files.append(path)
+
+        result["files"] = files
+    except Exception as error:
+        result["error"] = "{}: {}".format(type(error).__name__, error)
+    result["seconds"] = time.perf_counter() - start
+
+    return result
+
+
+def run(rows, directory, formats, generator=None, jobs=None, mesh=False):
+    os.makedirs(directory, exist_ok=True)
+    work = [
+        (kind, name, params, formats, directory, mesh)
+        for kind, name, params in variants(rows, generator)
+    ]
+
+    # import the generators once, before the workers fork
+    if not all(from_mesh(format, mesh) for format in formats):
+        for kind in {job[0] for job in work}:
+            if kind in SHAPES:
+                shape_function(kind)
+    if any(from_mesh(format, mesh) for format in formats):
+        mesh_module()
+
+    jobs = jobs or os.cpu_count()
+    if jobs == 1:
+        return [build_variant(job) for job in work]
+
+    # variants share nothing, so fork and keep every core busy
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(jobs, mp_context=context) as executor:
+        return list(executor.map(build_variant, work))
+
+
+def main(argv):
+    # FreeCADCmd passes the script itself along
+    argv = [arg for arg in argv if os.path.abspath(arg) != os.path.abspath(__file__)]
+
+    parser = argparse.ArgumentParser(description="build generator variants")
+    parser.add_argument("table", help="csv or json parameter table")
+    parser.add_argument("--generator", choices=sorted(SHAPES))
+    parser.add_argument("--output", default="variants")
+    parser.add_argument("--format", action="append", choices=FORMATS, dest="formats")
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument(
+        "--mesh",
+        action="store_true",
+        help="write stl straight from the profile, 3mf is always written so",
+    )
+    args, _ = parser.parse_known_args(argv)
+
+    start = time.perf_counter()
+    results = run(
+        read_table(args.table),
+        args.output,
+        args.formats or ["step"],
+        args.generator,
+        args.jobs,
+        args.mesh,
+    )
+    seconds = time.perf_counter() - start
+
+    with open(os.path.join(args.output, "summary.json"), "w") as file:
+        json.dump(results, file, indent=1, default=float)
+
+    failed = [result for result in results if "error" in result]
+    for result in failed:
+        print(result["name"], result["error"])
+    print("{} variants, {} failed, {:.1f}s".format(len(results), len(failed), seconds))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,259 @@
+# run headless with
+#   FreeCADCmd bench/bench.py
+# or with any python that can import FreeCAD
+#   python -m bench.bench --sweep full --output results.json
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import FreeCAD as App
+import numpy as np
+
+from common.cache import profile_cache
+from common.timing import recording
+from gear.gear import Gear
+from sprocket.sprocket import Sprocket
+from cycloid.cycloid import Cycloid
+from tube.tube import Tube
+from tube.cutlist import TubeSet
+
+SWEEPS = {
+    "quick": {
+        "teeth": [8, 40, 150],
+        "points": [10, 200],
+        "helix": [0, 20],
+        "lengths": [100, 1000],
+    },
+    "full": {
+        "teeth": [8, 12, 20, 40, 80, 150, 300],
+        "points": [10, 40, 200, 1000, 2000],
+        "helix": [0, 20],
+        "lengths": [10, 100, 1000, 10000],
+    },
+}
+
+GENERATORS = ["gear", "sprocket", "cycloid", "tube", "tube_set"]
+
+
+def gear_cases(sweep):
+    for teeth in sweep["teeth"]:
+        for points in sweep["points"]:
+            for helix_angle in sweep["helix"]:
+                yield Gear, {
+                    "Teeth": teeth,
+                    "PointsPerTooth": points,
+                    "HelixAngle": helix_angle,
+                }
+
+
+def sprocket_cases(sweep):
+    for teeth in sweep["teeth"]:
+        yield Sprocket, {"Teeth": teeth}
+
+
+def cycloid_cases(sweep):
+    for teeth in sweep["teeth"]:
+        for points in sweep["points"]:
+            # keep the default pin spacing as the lobe count grows
+            yield Cycloid, {
+                "Teeth": teeth,
+                "OuterDiameter": 52 * (teeth + 1) / 24,
+                "PointsPerTooth": points,
+            }
+
+
+def tube_cases(sweep):
+    for length in sweep["lengths"]:
+        for fillet in (0, 5):
+            yield Tube, {"Length": length, "Fillet": fillet}
+
+
+# frames of mitered members in eight lengths
+def tube_set_cases(sweep):
+    for count in (20, 200):
+        yield TubeSet, {
+            "Lengths": [250 + 50 * (i % 8) for i in range(count)],
+            "StartMiters": [45] * count,
+            "EndMiters": [45] * count,
+        }
+
+
+CASES = {
+    "gear": gear_cases,
+    "sprocket": sprocket_cases,
+    "cycloid": cycloid_cases,
+    "tube": tube_cases,
+    "tube_set": tube_set_cases,
+}
+
+
+def make_feature(doc, feature, values):
+    obj = doc.addObject("Part::FeaturePython", feature.__name__)
+    feature(obj)
+    # time the full build, not the preview new objects start in
+    if hasattr(obj, "LevelOfDetail"):
+        obj.LevelOfDetail = "Full"
+    for prop, value in values.items():
+        setattr(obj, prop, value)
+    return obj
+
+
+def rebuild(obj):
+    # start cold, without the profile cache, the kept stages or the
+    # unchanged input skip
+    profile_cache.clear()
+    obj.Proxy.parts = None
+    obj.Proxy.fingerprint = None
+    obj.touch()
+    obj.recompute()
+
+
+def time_recompute(obj, repeat):
+    best = None
+    for _ in range(repeat):
+        with recording() as stages:
+            start = time.perf_counter()
+            rebuild(obj)
+            seconds = time.perf_counter() - start
+
+        if best is None or seconds < best["seconds"]:
+            best = {"seconds": seconds, "stages": stages}
+
+    return best
+
+
+# separate from the timed runs, tracing slows python down
+def peak_memory(obj):
+    tracemalloc.start()
+    rebuild(obj)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "python_peak_kb": peak // 1024,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def shape_counts(shape):
+    return {
+        "solids": len(shape.Solids),
+        "faces": len(shape.Faces),
+        "edges": len(shape.Edges),
+        "valid": shape.isValid(),
+    }
+
+
+def run_case(doc, feature, values, repeat):
+    obj = make_feature(doc, feature, values)
+
+    result = {"generator": feature.__name__}
+    result.update(values)
+    result.update(time_recompute(obj, repeat))
+    result.update(peak_memory(obj))
+    result.update(shape_counts(obj.Shape))
+
+    doc.removeObject(obj.Name)
+    return result
+
+
+def run(sweep, generators, repeat):
+    doc = App.newDocument("Bench")
+
+    results = []
+    for generator in generators:
+        for feature, values in CASES[generator](sweep):
+            result = run_case(doc, feature, values, repeat)
+            results.append(result)
+
+            stages = " ".join(
+                "{}={:.4f}".format(name, seconds)
+                for name, seconds in sorted(result["stages"].items())
+            )
+            print(
+                "{:9} {:55} {:8.4f}s {:6} faces  {}".format(
+                    result["generator"],
+                    str(values),
+                    result["seconds"],
+                    result["faces"],
+                    stages,
+                )
+            )
+
+    App.closeDocument(doc.Name)
+    return results
+
+
+def compare_generation_modes(teeth_counts=(12, 40, 100), repeat=3):
+    doc = App.newDocument("GenerationModeBench")
+
+    cases = []
+    for teeth in teeth_counts:
+        for helix_angle in (0, 20):
+            cases.append((Gear, {"Teeth": teeth, "HelixAngle": helix_angle}))
+        cases.append((Sprocket, {"Teeth": teeth}))
+        cases.append((Cycloid, {"Teeth": teeth, "PointsPerTooth": 40}))
+
+    results = []
+    for feature, values in cases:
+        for mode in ("Outline", "ToothPattern"):
+            result = run_case(doc, feature, dict(values, GenerationMode=mode), repeat)
+            results.append(result)
+
+            print(
+                "{:9} {:13} {:40} {:8.3f}s {:5} faces".format(
+                    feature.__name__,
+                    mode,
+                    str(values),
+                    result["seconds"],
+                    result["faces"],
+                )
+            )
+
+    App.closeDocument(doc.Name)
+    return results
+
+
+def environment():
+    return {
+        "freecad": ".".join(App.Version()[:3]),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="benchmark the generators")
+    parser.add_argument("--sweep", choices=sorted(SWEEPS), default="quick")
+    parser.add_argument(
+        "--generator", action="append", choices=GENERATORS, dest="generators"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compare-modes", action="store_true")
+    parser.add_argument("--output")
+    # FreeCADCmd passes its own arguments along
+    args, _ = parser.parse_known_args(argv)
+
+    if args.compare_modes:
+        results = compare_generation_modes(repeat=args.repeat)
+    else:
+        results = run(SWEEPS[args.sweep], args.generators or GENERATORS, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(
+                {"environment": environment(), "results": results}, file, indent=1
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,142 @@
+# tooth profile regression check, exits non zero when the vectorized flank
+# sampling or the mirrored tooth drift from a per sample scalar reference
+# by more than --tolerance times the pitch radius
+#   python -m bench.flankcheck
+#   python -m bench.flankcheck --tolerance 1e-12
+import argparse
+import itertools
+import math
+import sys
+
+import numpy as np
+
+try:
+    from macro.kernel.gear import (
+        flank_points,
+        gear_segments,
+        gear_tooth,
+        involute_args,
+        involute_point,
+        tooth_geometry,
+        trochoid_args,
+        trochoid_point,
+    )
+    from macro.kernel.geometry import mirror_segments
+except ModuleNotFoundError:
+    from kernel.gear import (
+        flank_points,
+        gear_segments,
+        gear_tooth,
+        involute_args,
+        involute_point,
+        tooth_geometry,
+        trochoid_args,
+        trochoid_point,
+    )
+    from kernel.geometry import mirror_segments
+
+TEETH = [6, 12, 25, 80]
+PRESSURE_ANGLES = [14.5, 20, 25]
+PROFILE_SHIFT_FACTORS = [-0.3, 0, 0.5]
+POINTS_PER_TOOTH = 40
+
+
+# the uniform flank samples one point at a time, the way the scalar code
+# placed them before the sampling was vectorized
+def scalar_flanks(geometry, points_per_tooth):
+    trochoid_step = (
+        geometry["trochoid_end"] - geometry["trochoid_start"]
+    ) / points_per_tooth
+    involute_step = (
+        geometry["involute_end"] - geometry["involute_start"]
+    ) / points_per_tooth
+
+    trochoid = [
+        trochoid_point(
+            geometry["trochoid_start"] + i * trochoid_step, *trochoid_args(geometry)
+        )
+        for i in range(points_per_tooth + 1)
+    ]
+    involute = [
+        involute_point(
+            geometry["involute_start"] + i * involute_step, *involute_args(geometry)
+        )
+        for i in range(1, points_per_tooth + 1)
+    ]
+    return np.array(trochoid), np.array(involute)
+
+
+def largest_difference(first, second):
+    if len(first) != len(second):
+        return math.inf
+    return float(np.abs(np.asarray(first) - np.asarray(second)).max())
+
+
+def segments_difference(first, second):
+    if len(first) != len(second):
+        return math.inf
+    difference = 0
+    for a, b in zip(first, second):
+        if a["kind"] != b["kind"]:
+            return math.inf
+        difference = max(difference, largest_difference(a["points"], b["points"]))
+    return difference
+
+
+def check(teeth, pressure_angle, profile_shift_factor, tolerance):
+    gear = {
+        "teeth": teeth,
+        "module": 1,
+        "pressure_angle": pressure_angle,
+        "profile_shift_factor": profile_shift_factor,
+    }
+    geometry = tooth_geometry(
+        teeth, 1, math.radians(pressure_angle), 0, 1.25, 1, profile_shift_factor
+    )
+    limit = tolerance * geometry["pitch_radius"]
+
+    problems = []
+    trochoid, involute = flank_points(geometry, POINTS_PER_TOOTH)
+    scalar_trochoid, scalar_involute = scalar_flanks(geometry, POINTS_PER_TOOTH)
+    for name, first, second in (
+        ("trochoid", trochoid, scalar_trochoid),
+        ("involute", involute, scalar_involute),
+    ):
+        difference = largest_difference(first, second)
+        if difference > limit:
+            problems.append("{} off by {:.3g}".format(name, difference))
+
+    half = gear_tooth(points_per_tooth=POINTS_PER_TOOTH, **gear).segments()
+    whole = half + mirror_segments(half, teeth)
+    difference = segments_difference(
+        gear_segments(points_per_tooth=POINTS_PER_TOOTH, **gear), whole
+    )
+    if difference > limit:
+        problems.append("mirrored tooth off by {:.3g}".format(difference))
+
+    return problems
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="check the sampled tooth profile")
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for case in itertools.product(TEETH, PRESSURE_ANGLES, PROFILE_SHIFT_FACTORS):
+        problems = check(*case, args.tolerance)
+        if problems:
+            failed = True
+            print(
+                "teeth {} pressure angle {} profile shift {}: {}".format(
+                    *case, ", ".join(problems)
+                )
+            )
+
+    count = len(TEETH) * len(PRESSURE_ANGLES) * len(PROFILE_SHIFT_FACTORS)
+    print("{} gears, {}".format(count, "failed" if failed else "ok"))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
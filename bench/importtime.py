@@ -0,0 +1,108 @@
+# import time regression check, exits non zero when a module pulls in a
+# dependency it should only load lazily or takes longer than --budget ms
+#   python -m bench.importtime
+#   python -m bench.importtime --budget 500 kernel.gear gear.gear
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> top level packages it must not import
+FORBIDDEN = {
+    "kernel.gear": ["FreeCAD", "Part", "scipy"],
+    "kernel.sprocket": ["FreeCAD", "Part", "scipy"],
+    "kernel.cycloid": ["FreeCAD", "Part", "scipy"],
+    "kernel.profiles": ["FreeCAD", "Part", "scipy"],
+    "kernel.meshing": ["FreeCAD", "Part", "scipy"],
+    "kernel.mesh": ["FreeCAD", "Part", "scipy"],
+    "kernel.rack": ["FreeCAD", "Part", "scipy"],
+    "kernel.search": ["FreeCAD", "Part", "scipy"],
+    "kernel.tooth": ["FreeCAD", "Part", "scipy"],
+    "gear.gear": ["scipy"],
+    "sprocket.sprocket": ["scipy"],
+    "cycloid.cycloid": ["scipy"],
+    "cycloid.drive": ["scipy"],
+    "tube.tube": ["scipy", "numpy"],
+    "tube.cutlist": ["scipy", "numpy"],
+    "common.detail": ["scipy", "numpy"],
+    "rack.rack": ["scipy"],
+    "worm.worm": ["scipy"],
+}
+
+# these need FreeCAD, without it they are skipped
+FREECAD_MODULES = [
+    "gear.gear",
+    "sprocket.sprocket",
+    "cycloid.cycloid",
+    "cycloid.drive",
+    "tube.tube",
+    "tube.cutlist",
+    "common.detail",
+    "rack.rack",
+    "worm.worm",
+]
+
+
+# (name, self us, cumulative us) for every module the import loaded
+def import_times(module):
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise ImportError(process.stderr.strip().splitlines()[-1])
+
+    times = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        times.append((name.strip(), int(own), int(cumulative)))
+
+    return times
+
+
+def check(module, budget=None):
+    times = import_times(module)
+    loaded = {name.split(".")[0] for name, _, _ in times}
+    total = next(cumulative for name, _, cumulative in times if name == module)
+
+    problems = [
+        "imports " + package
+        for package in FORBIDDEN.get(module, [])
+        if package in loaded
+    ]
+    if budget is not None and total > budget * 1000:
+        problems.append("{:.0f} ms over the {} ms budget".format(total / 1000, budget))
+
+    return total, problems
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="check module import times")
+    parser.add_argument("modules", nargs="*", default=sorted(FORBIDDEN))
+    parser.add_argument("--budget", type=float, help="milliseconds per module")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        try:
+            total, problems = check(module, args.budget)
+        except ImportError as error:
+            if module in FREECAD_MODULES:
+                print("{:20} skipped, {}".format(module, error))
+                continue
+            raise
+
+        failed = failed or bool(problems)
+        print("{:20} {:8.1f} ms  {}".format(module, total / 1000, ", ".join(problems)))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,96 @@
+# mesh export regression check, exits non zero when a setting away from its
+# default leaves the exported mesh unchanged, that is the mesh path dropped
+# the keyword on its way to the profile, or when a setting the mesh can not
+# show is accepted
+#   python -m bench.meshcheck
+import sys
+
+import numpy as np
+
+try:
+    from macro.kernel.mesh import MESHES
+except ModuleNotFoundError:
+    from kernel.mesh import MESHES
+
+# kind -> keywords that must each change the mesh of the defaults
+CHANGES = {
+    "gear": [
+        {"module": 3},
+        {"pressure_angle": 25},
+        {"profile_shift_factor": 0.2},
+        {"points_per_tooth": 20},
+        {"second_radius": 5},
+    ],
+    "sprocket": [
+        {"pitch": 15.875},
+        {"seat_radius": 4},
+        {"seat_clear_angle": 30},
+        {"chain": "ANSI 40"},
+    ],
+    "cycloid": [
+        {"eccentricity": 2},
+        {"outer_diameter": 80},
+        {"pin_diameter": 5},
+        {"points_per_tooth": 20},
+    ],
+}
+
+# kind -> keywords that must each be refused with a ValueError
+REFUSED = {
+    "gear": [
+        {"teeth_override": 5},
+        {"start_angle": 0, "end_angle": 90},
+        {"bolt_circle_diameter": 10, "bolt_diameter": 2, "bolt_count": 4},
+    ],
+    "sprocket": [
+        {"strands": 2},
+        {"start_angle": 30, "end_angle": 120},
+        {"bolt_circle_diameter": 10, "bolt_diameter": 2, "bolt_count": 4},
+    ],
+    "cycloid": [
+        {"end_angle": 180},
+        {"bolt_circle_diameter": 10, "bolt_diameter": 2, "bolt_count": 4},
+    ],
+}
+
+
+def refused(kind, values):
+    try:
+        MESHES[kind](**values)
+    except ValueError:
+        return True
+    return False
+
+
+def same_mesh(first, second):
+    return all(
+        a.shape == b.shape and np.array_equal(a, b) for a, b in zip(first, second)
+    )
+
+
+def check(kind):
+    default = MESHES[kind]()
+    problems = [
+        "{} leaves the mesh unchanged".format(values)
+        for values in CHANGES[kind]
+        if same_mesh(default, MESHES[kind](**values))
+    ]
+    return problems + [
+        "{} is not refused".format(values)
+        for values in REFUSED[kind]
+        if not refused(kind, values)
+    ]
+
+
+def main(argv):
+    failed = False
+    for kind in argv or sorted(CHANGES):
+        problems = check(kind)
+        failed = failed or bool(problems)
+        print("{:10} {}".format(kind, ", ".join(problems) or "ok"))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
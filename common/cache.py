@@ -0,0 +1,158 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import Part
+import FreeCAD as App
+
+# bump when the profile math changes so stale disk entries are ignored
+VERSION = 3
+
+PARAMETERS = "User parameter:BaseApp/Preferences/Macros/FreecadMacro"
+
+
+def normalize(value):
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, float):
+        # collapse -0.0 and float noise from unit conversions
+        return format(value + 0.0, ".12g")
+    if isinstance(value, (list, tuple)):
+        return "(" + ",".join(normalize(v) for v in value) + ")"
+    return repr(value)
+
+
+# the kind and the builder name, not its module, so a profile built through
+# the macro. imports and the plain ones share a disk entry
+def make_key(kind, build, args):
+    text = "|".join(
+        [str(VERSION), kind, build.__qualname__] + [normalize(arg) for arg in args]
+    )
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class ProfileCache:
+    def __init__(self, max_entries=256, disk=False, directory=None):
+        self.max_entries = max_entries
+        self.disk = disk
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.disk_writes = 0
+        # builds may run in worker threads, the profile itself is built
+        # outside the lock
+        self.lock = threading.Lock()
+
+    def disk_path(self, key):
+        directory = self.directory
+        if directory is None:
+            directory = os.path.join(App.getUserAppDataDir(), "ProfileCache")
+        return os.path.join(directory, key + ".brep")
+
+    def load(self, key):
+        path = self.disk_path(key)
+        if not os.path.exists(path):
+            return None
+
+        shape = Part.Shape()
+        try:
+            with open(path) as file:
+                shape.importBrepFromString(file.read())
+        except Exception as error:
+            print("profile cache read fail", path, error)
+            return None
+
+        return shape.Edges
+
+    # a cache directory that can not be written only loses the disk entry
+    def save(self, key, edges):
+        path = self.disk_path(key)
+        temp_path = "{}.{}.tmp".format(path, threading.get_ident())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "w") as file:
+                file.write(Part.makeCompound(edges).exportBrepToString())
+            os.replace(temp_path, path)
+        except OSError as error:
+            print("profile cache write fail", path, error)
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        with self.lock:
+            self.disk_writes += 1
+
+    def store(self, key, edges):
+        with self.lock:
+            self.entries[key] = edges
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def lookup(self, key):
+        with self.lock:
+            edges = self.entries.get(key)
+            if edges is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            return edges
+
+    def edges(self, kind, build, args):
+        key = make_key(kind, build, args)
+
+        edges = self.lookup(key)
+        if edges is not None:
+            return [edge.copy() for edge in edges]
+
+        if self.disk:
+            edges = self.load(key)
+            if edges is not None:
+                with self.lock:
+                    self.disk_hits += 1
+
+        if edges is None:
+            with self.lock:
+                self.misses += 1
+            result = build(*args)
+            edges = result if isinstance(result, list) else result.Edges
+
+            if self.disk:
+                self.save(key, edges)
+
+        self.store(key, edges)
+        return [edge.copy() for edge in edges]
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk": self.disk,
+            "disk_hits": self.disk_hits,
+            "disk_writes": self.disk_writes,
+        }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.disk_hits = 0
+            self.disk_writes = 0
+
+
+parameters = App.ParamGet(PARAMETERS)
+profile_cache = ProfileCache(
+    max_entries=parameters.GetInt("ProfileCacheSize", 256),
+    disk=parameters.GetBool("ProfileDiskCache", False),
+)
+
+
+def cached_edges(kind, build, args):
+    return profile_cache.edges(kind, build, args)
@@ -0,0 +1,36 @@
+import Part
+import FreeCAD as App
+
+# Part geometry from the kernel point arrays and segments
+
+
+def to_vectors(points):
+    return [App.Vector(x, y, 0) for x, y in points.tolist()]
+
+
+# with tangents, the spline the adaptive sampling measured its deviation
+# against
+def interpolate(points, tangents=None):
+    curve = Part.BSplineCurve()
+    if tangents is None:
+        curve.interpolate(points)
+    else:
+        curve.interpolate(Points=points, Tangents=to_vectors(tangents))
+    return curve.toShape()
+
+
+def segment_edge(segment):
+    points = to_vectors(segment["points"])
+    if segment["kind"] == "arc":
+        return Part.Arc(*points).toShape()
+    return interpolate(points, segment["tangents"])
+
+
+def segment_edges(segments):
+    return [segment_edge(segment) for segment in segments]
+
+
+# the edges of a whole kernel.tooth profile, a mirrored half is mirrored in
+# the arrays so every edge is built straight from its points
+def profile_edges(profile):
+    return segment_edges(profile.whole().segments())
@@ -0,0 +1,52 @@
+import Part
+import FreeCAD as App
+
+try:
+    from macro.common.convert import to_vectors
+    from macro.common.timing import stage
+except ModuleNotFoundError:
+    from common.convert import to_vectors
+    from common.timing import stage
+
+# Preview builds a polyline profile with few points, extruded straight. new
+# objects start in Preview, finalize and export build them Full
+LEVELS_OF_DETAIL = ["Preview", "Full"]
+
+# points per tooth and per arc of a preview profile
+PREVIEW_POINTS = 8
+
+
+def polyline_wire(points):
+    with stage("wire"):
+        vectors = to_vectors(points)
+        return Part.makePolygon(vectors + vectors[:1])
+
+
+# the closed polyline through points extruded straight up by height from
+# bottom
+def preview_solid(points, bottom, height):
+    wire = polyline_wire(points)
+
+    with stage("face"):
+        face = Part.Face(wire)
+        face.translate(App.Vector(0, 0, bottom))
+
+    with stage("extrude"):
+        return face.extrude(App.Vector(0, 0, height))
+
+
+# sets the objects with a level of detail, the selected ones or every one in
+# doc, to Full and recomputes, returns how many were previews
+def finalize(objects=None, doc=None):
+    doc = doc or App.ActiveDocument
+    if not objects:
+        objects = doc.Objects
+
+    count = 0
+    for obj in objects:
+        if getattr(obj, "LevelOfDetail", "Full") != "Full":
+            obj.LevelOfDetail = "Full"
+            count += 1
+
+    doc.recompute()
+    return count
@@ -0,0 +1,157 @@
+import hashlib
+import time
+
+try:
+    from macro.common.cache import normalize
+    from macro.common import timing
+except ModuleNotFoundError:
+    from common.cache import normalize
+    from common import timing
+
+# properties that never change the generated shape
+IGNORED_PROPERTIES = {
+    "ExpressionEngine",
+    "Label",
+    "Label2",
+    "Placement",
+    "Proxy",
+    "Shape",
+    "Visibility",
+}
+
+
+def property_fingerprint(obj):
+    values = []
+    for name in sorted(obj.PropertiesList):
+        if name in IGNORED_PROPERTIES:
+            continue
+        # read only properties are outputs written by build
+        if "ReadOnly" in obj.getEditorMode(name):
+            continue
+        values.append(name + "=" + normalize(getattr(obj, name)))
+
+    return hashlib.sha1("|".join(values).encode()).hexdigest()
+
+
+def property_name(keyword):
+    return "".join(part.capitalize() for part in keyword.split("_"))
+
+
+def shape_keywords(shape, obj):
+    return {
+        keyword: getattr(obj, property_name(keyword))
+        for keyword in shape.__code__.co_varnames[: shape.__code__.co_argcount]
+    }
+
+
+# what build(*args) returns, or what parts holds for name when it was built
+# for the same key before. key holds the inputs the stage depends on, the
+# result is shared between builds so callers copy shapes they change
+def memo(parts, name, key, build, *args):
+    key = normalize(key)
+    entry = parts.get(name)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+
+    result = build(*args)
+    parts[name] = (key, result)
+    return result
+
+
+# stands in for a restored object while the proxy __init__ runs again, only
+# the properties the saved object lacks are added, with their defaults
+class MissingProperties:
+    def __init__(self, obj):
+        object.__setattr__(self, "obj", obj)
+        object.__setattr__(self, "existing", set(obj.PropertiesList))
+        object.__setattr__(self, "added", set())
+
+    def addProperty(self, type, name, *args):
+        if name not in self.existing:
+            self.obj.addProperty(type, name, *args)
+            self.existing.add(name)
+            self.added.add(name)
+        return self
+
+    def setEditorMode(self, name, mode):
+        if name in self.added:
+            self.obj.setEditorMode(name, mode)
+
+    def __setattr__(self, name, value):
+        if name in self.added:
+            setattr(self.obj, name, value)
+
+    def __getattr__(self, name):
+        return getattr(self.obj, name)
+
+
+# base for the FeaturePython proxies, subclasses set shape to a function
+# taking their properties as snake case keywords and returning the shape and
+# a dict of read only output properties, or override build(obj). execute
+# skips the build while the input properties keep the values of the last
+# build, the fingerprint is saved with the document so this holds after
+# reopening it too. shape also gets parts, where it keeps its stages
+# between builds with memo, so a height edit reuses the profile
+class Feature:
+    fingerprint = None
+    shape = None
+    parts = None
+    # values for properties a saved document lacks where they differ from
+    # the default of a new object, a saved part was built in full
+    restored_values = {"LevelOfDetail": "Full"}
+
+    def build(self, obj):
+        self.assign(obj, *self.compute(shape_keywords(self.shape, obj)))
+
+    # the shape and outputs for the shape keywords, this only touches the
+    # kept stages, not the object, so it can run off the main thread
+    def compute(self, keywords):
+        # the stages live with the proxy, not in the saved document
+        if self.parts is None:
+            self.parts = {}
+
+        return self.shape(parts=self.parts, **keywords)
+
+    def assign(self, obj, shape, outputs):
+        obj.Shape = shape
+        for name, value in outputs.items():
+            setattr(obj, name, value)
+
+    # a document saved before a property was added gets it with its default,
+    # the shape keywords read every property
+    def onDocumentRestored(self, obj):
+        missing = MissingProperties(obj)
+        self.__init__(missing)
+        for name in missing.added:
+            if name in self.restored_values:
+                setattr(obj, name, self.restored_values[name])
+
+    def execute(self, obj):
+        self.onDocumentRestored(obj)
+        fingerprint = property_fingerprint(obj)
+        if fingerprint == self.fingerprint and not obj.Shape.isNull():
+            return
+
+        if timing.enabled:
+            with timing.recording() as stages:
+                start = time.perf_counter()
+                self.build(obj)
+                seconds = time.perf_counter() - start
+            timing.record(obj, seconds, stages)
+        else:
+            self.build(obj)
+        self.fingerprint = fingerprint
+
+    def dumps(self):
+        return {"fingerprint": self.fingerprint}
+
+    def loads(self, state):
+        if state:
+            self.fingerprint = state.get("fingerprint")
+
+    # FreeCAD before 0.21
+    def __getstate__(self):
+        return self.dumps()
+
+    def __setstate__(self, state):
+        self.loads(state)
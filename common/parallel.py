@@ -0,0 +1,113 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import FreeCAD as App
+
+try:
+    from macro.common.cache import PARAMETERS
+    from macro.common.feature import Feature, property_fingerprint, shape_keywords
+    from macro.common import timing
+except ModuleNotFoundError:
+    from common.cache import PARAMETERS
+    from common.feature import Feature, property_fingerprint, shape_keywords
+    from common import timing
+
+
+# the generator objects a recompute would rebuild, with their fingerprint
+# and shape keywords read here on the main thread. objects driven by
+# expressions wait for the serial recompute, their inputs may still change
+def pending_builds(objects):
+    pending = []
+    for obj in objects:
+        proxy = getattr(obj, "Proxy", None)
+        if not isinstance(proxy, Feature) or proxy.shape is None:
+            continue
+        # a proxy with its own build may read more than the keywords
+        if type(proxy).build is not Feature.build or obj.ExpressionEngine:
+            continue
+
+        proxy.onDocumentRestored(obj)
+        fingerprint = property_fingerprint(obj)
+        if fingerprint == proxy.fingerprint and not obj.Shape.isNull():
+            continue
+        pending.append((obj, fingerprint, shape_keywords(proxy.shape, obj)))
+
+    return pending
+
+
+# runs in a worker, the seconds are the cpu time of the thread so the sum
+# over all builds is what they take one after another
+def compute(proxy, keywords):
+    start = time.thread_time()
+    with timing.recording() as stages:
+        shape, outputs = proxy.compute(keywords)
+    return shape, outputs, time.thread_time() - start, stages
+
+
+# rebuilds the touched generator objects of doc side by side in a thread
+# pool, the profile math and most OCC calls run in the workers and only the
+# shape assignment runs on the main thread. a build that fails is left to
+# the serial recompute afterwards, which also handles everything else.
+# returns the object count, the wall seconds and the summed build seconds
+def regenerate(doc=None, jobs=None):
+    doc = doc or App.ActiveDocument
+    if jobs is None:
+        jobs = App.ParamGet(PARAMETERS).GetInt("RegenerateJobs", 0)
+    jobs = jobs or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    pending = pending_builds(doc.Objects)
+    if jobs == 1 or len(pending) < 2:
+        doc.recompute()
+        seconds = time.perf_counter() - start
+        return {
+            "objects": len(pending),
+            "failed": 0,
+            "seconds": seconds,
+            "build_seconds": seconds,
+        }
+
+    build_seconds = 0
+    failed = []
+    with ThreadPoolExecutor(min(jobs, len(pending))) as executor:
+        futures = [
+            executor.submit(compute, obj.Proxy, keywords)
+            for obj, _, keywords in pending
+        ]
+        for (obj, fingerprint, _), future in zip(pending, futures):
+            try:
+                shape, outputs, seconds, stages = future.result()
+            except Exception as error:
+                failed.append(obj)
+                App.Console.PrintWarning(
+                    "{} parallel build failed, rebuilding serially: {}\n".format(
+                        obj.Label, error
+                    )
+                )
+                continue
+
+            obj.Proxy.assign(obj, shape, outputs)
+            obj.Proxy.fingerprint = fingerprint
+            build_seconds += seconds
+            if timing.enabled:
+                timing.record(obj, seconds, stages)
+
+    # the rebuilt objects match their fingerprint and skip their execute
+    for obj in failed:
+        obj.Proxy.fingerprint = None
+        obj.touch()
+    doc.recompute()
+
+    seconds = time.perf_counter() - start
+    App.Console.PrintMessage(
+        "{} objects in {:.3f}s, {:.3f}s one after another, {:.1f}x\n".format(
+            len(pending), seconds, build_seconds, build_seconds / max(seconds, 1e-9)
+        )
+    )
+    return {
+        "objects": len(pending),
+        "failed": len(failed),
+        "seconds": seconds,
+        "build_seconds": build_seconds,
+    }
@@ -0,0 +1,123 @@
+import math
+
+import Part
+import FreeCAD as App
+
+GENERATION_MODES = ["Outline", "ToothPattern"]
+
+
+# close the edges of one tooth into a pie slice reaching in (or out for
+# internal gears) to radius, a radius of 0 closes at the center. the arc at
+# radius passes through middle, an angle in degrees, or the middle of its
+# ends, which only holds for slices below half a turn
+def sector_wire(edges, radius, middle=None):
+    open_wire = Part.Wire(Part.__sortEdges__(edges))
+    start = open_wire.OrderedVertexes[0].Point
+    end = open_wire.OrderedVertexes[-1].Point
+
+    closing = []
+    if radius == 0:
+        center = App.Vector(0, 0, 0)
+        closing.append(Part.makeLine(end, center))
+        closing.append(Part.makeLine(center, start))
+    else:
+        end_inner = App.Vector(end.x, end.y, 0).normalize().multiply(radius)
+        start_inner = App.Vector(start.x, start.y, 0).normalize().multiply(radius)
+        if middle is None:
+            midpoint = end_inner.add(start_inner).multiply(0.5).normalize()
+        else:
+            angle = math.radians(middle)
+            midpoint = App.Vector(math.cos(angle), math.sin(angle), 0)
+
+        arc = Part.Arc(end_inner, midpoint.multiply(radius), start_inner)
+        closing.append(Part.makeLine(end, end_inner))
+        closing.append(arc.toShape())
+        closing.append(Part.makeLine(start_inner, start))
+
+    return Part.Wire(open_wire.Edges + closing)
+
+
+# count copies of the edges of one tooth, turned on from tooth first
+def sector_edges(edges, teeth, first, count):
+    center = App.Vector(0, 0, 0)
+    zaxis = App.Vector(0, 0, 1)
+
+    copies = []
+    for t in range(first, first + count):
+        for edge in edges:
+            if t == 0:
+                copies.append(edge)
+            else:
+                copies.append(edge.copy().rotate(center, zaxis, 360 / teeth * t))
+
+    return copies
+
+
+# rotated copies of one tooth solid fused into a single solid, the teeth
+# from first on
+def pattern_solid(solid, teeth, count=None, first=0):
+    if count is None:
+        count = teeth
+
+    center = App.Vector(0, 0, 0)
+    zaxis = App.Vector(0, 0, 1)
+
+    if first != 0:
+        solid = solid.copy().rotate(center, zaxis, 360 / teeth * first)
+
+    copies = []
+    for t in range(1, count):
+        copies.append(solid.copy().rotate(center, zaxis, 360 / teeth * t))
+
+    if len(copies) == 0:
+        return solid
+
+    return solid.multiFuse(copies).removeSplitter()
+
+
+# count holes on a circle drilled along z through the solid, spread evenly
+# over the sector from start_angle to end_angle in degrees, or around a
+# full turn. the solid is left as it is without a circle, hole or count
+def bolt_circle_solid(
+    solid, circle_diameter, hole_diameter, count, start_angle=0, end_angle=360
+):
+    if circle_diameter <= 0 or hole_diameter <= 0 or count <= 0:
+        return solid
+
+    span = end_angle - start_angle
+    if span >= 360:
+        angles = [start_angle + 360 / count * k for k in range(count)]
+    else:
+        angles = [start_angle + span / count * (k + 0.5) for k in range(count)]
+
+    box = solid.BoundBox
+    drills = []
+    for angle in angles:
+        angle = math.radians(angle)
+        base = App.Vector(
+            circle_diameter / 2 * math.cos(angle),
+            circle_diameter / 2 * math.sin(angle),
+            box.ZMin - 1,
+        )
+        drills.append(
+            Part.makeCylinder(
+                hole_diameter / 2, box.ZLength + 2, base, App.Vector(0, 0, 1)
+            )
+        )
+
+    return solid.cut(Part.makeCompound(drills))
+
+
+# copies of one tooth solid translated by pitch along direction, fused into
+# a single solid
+def linear_pattern_solid(solid, pitch, count, direction=App.Vector(1, 0, 0)):
+    copies = []
+    for t in range(1, count):
+        copy = solid.copy()
+        copy.translate(direction * (pitch * t))
+        copies.append(copy)
+
+    if len(copies) == 0:
+        return solid
+
+    return solid.multiFuse(copies).removeSplitter()
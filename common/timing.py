@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import FreeCAD as App
+
+try:
+    from macro.common.cache import PARAMETERS
+except ModuleNotFoundError:
+    from common.cache import PARAMETERS
+
+# current holds stage name -> seconds while a recording is active in the
+# thread, so builds running side by side keep their stages apart
+local = threading.local()
+
+# per object timings of the last build, keyed by document and object name
+registry = {}
+
+# recorded by Feature.execute when FREECAD_MACRO_TIMING=1 or the Timing
+# parameter is set, switch at runtime with enable()
+enabled = os.environ.get("FREECAD_MACRO_TIMING", "0") not in ("", "0")
+enabled = enabled or App.ParamGet(PARAMETERS).GetBool("Timing", False)
+
+
+class NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_STAGE = NullStage()
+
+
+class Stage:
+    __slots__ = ("stages", "name", "start")
+
+    def __init__(self, stages, name):
+        self.stages = stages
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        self.stages[self.name] = self.stages.get(self.name, 0) + seconds
+        return False
+
+
+def stage(name):
+    current = getattr(local, "current", None)
+    if current is None:
+        return NULL_STAGE
+    return Stage(current, name)
+
+
+@contextmanager
+def recording():
+    previous = getattr(local, "current", None)
+    local.current = stages = {}
+    try:
+        yield stages
+    finally:
+        local.current = previous
+        # nested recordings also count towards the outer one
+        if previous is not None:
+            for name, seconds in stages.items():
+                previous[name] = previous.get(name, 0) + seconds
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def shape_counts(shape):
+    return {
+        "solids": len(shape.Solids),
+        "faces": len(shape.Faces),
+        "edges": len(shape.Edges),
+        "vertexes": len(shape.Vertexes),
+    }
+
+
+def record(obj, seconds, stages):
+    key = (obj.Document.Name, obj.Name)
+    entry = registry.get(key)
+    builds = entry["builds"] if entry else 0
+    registry[key] = {
+        "document": obj.Document.Name,
+        "name": obj.Name,
+        "label": obj.Label,
+        "type": obj.Proxy.__class__.__name__,
+        "builds": builds + 1,
+        "seconds": seconds,
+        "stages": stages,
+        "counts": shape_counts(obj.Shape),
+    }
+
+
+def entries(doc=None):
+    values = [
+        entry
+        for entry in registry.values()
+        if doc is None or entry["document"] == doc.Name
+    ]
+    return sorted(values, key=lambda entry: entry["seconds"], reverse=True)
+
+
+def report(doc=None):
+    lines = []
+    for entry in entries(doc):
+        lines.append(
+            "{:24} {:9} {:8.4f}s {:5} faces {:6} edges".format(
+                entry["label"],
+                entry["type"],
+                entry["seconds"],
+                entry["counts"]["faces"],
+                entry["counts"]["edges"],
+            )
+        )
+        for name, seconds in sorted(
+            entry["stages"].items(), key=lambda item: item[1], reverse=True
+        ):
+            lines.append("    {:14} {:8.4f}s".format(name, seconds))
+
+    text = "\n".join(lines) + "\n"
+    App.Console.PrintMessage(text)
+    return text
+
+
+def clear():
+    registry.clear()
@@ -1,58 +1,114 @@
 import Part
 import FreeCAD as App
-import math
 
-def spread(input, curvature):
-    x = input * 2 - 1
-    mapped = (x - curvature * x) / (curvature - 2 * curvature * abs(x) + 1)
-    return (mapped + 1) / 2
+try:
+    from macro.common.cache import cached_edges
+    from macro.common.feature import Feature, memo
+    from macro.common.timing import stage
+    from macro.common.pattern import GENERATION_MODES, sector_wire, sector_edges, pattern_solid, bolt_circle_solid
+    from macro.common.convert import segment_edge
+    from macro.common.detail import LEVELS_OF_DETAIL, PREVIEW_POINTS, preview_solid
+    from macro.kernel.sampling import SAMPLING_MODES
+    from macro.kernel.cycloid import tooth_segment, cycloid_tooth
+    from macro.kernel.geometry import sector_polyline, sector_teeth
+except ModuleNotFoundError:
+    from common.cache import cached_edges
+    from common.feature import Feature, memo
+    from common.timing import stage
+    from common.pattern import GENERATION_MODES, sector_wire, sector_edges, pattern_solid, bolt_circle_solid
+    from common.convert import segment_edge
+    from common.detail import LEVELS_OF_DETAIL, PREVIEW_POINTS, preview_solid
+    from kernel.sampling import SAMPLING_MODES
+    from kernel.cycloid import tooth_segment, cycloid_tooth
+    from kernel.geometry import sector_polyline, sector_teeth
 
-def cycloid_point(theta, teethp1, eccentricity, teethp1_ecc, outer_radius, outer_pin_radius):
-    sin_theta = math.sin(theta)
-    cos_theta = math.cos(theta)
+def tooth_edge(teeth, eccentricity, outer_diameter, pin_diameter, points_per_tooth, sampling_mode, sampling_tolerance):
+    with stage("sampling"):
+        segment = tooth_segment(teeth, eccentricity, outer_diameter, pin_diameter, points_per_tooth, sampling_mode, sampling_tolerance)
+
+    with stage("spline"):
+        return segment_edge(segment)
+
+
+# the disc face at z = 0, the sector of count lobes from lobe first on, or
+# the face of one lobe sector for ToothPattern
+def cycloid_face(profile, generation_mode, first, count):
+    edge = cached_edges("cycloid", tooth_edge, profile)[0]
+
+    if generation_mode == "ToothPattern":
+        with stage("face"):
+            return Part.Face(sector_wire([edge], 0))
+
+    teeth = profile[0]
     
-    teethp1_theta = teethp1 * theta
-    sin_teethp1_theta = math.sin(teethp1_theta)
-    cos_teethp1_theta = math.cos(teethp1_theta)
+    with stage("wire"):
+        edges = sector_edges([edge], teeth, first, count)
+        if count != teeth:
+            wire = sector_wire(edges, 0)
+        else:
+            wire = Part.Wire(edges)
+    with stage("face"):
+        return Part.Face(wire)
 
-    x = outer_radius * sin_theta + eccentricity * sin_teethp1_theta
-    y = outer_radius * cos_theta + eccentricity * cos_teethp1_theta
 
-    dx = outer_radius * cos_theta + teethp1_ecc * cos_teethp1_theta
-    dy = -outer_radius * sin_theta - teethp1_ecc * sin_teethp1_theta
+# a coarse polyline of count lobes from lobe first on for a Preview
+def preview_disc(profile, first, count, height):
+    teeth = profile[0]
+    with stage("sampling"):
+        tooth = cycloid_tooth(teeth, *profile[1:4], PREVIEW_POINTS, "Uniform", profile[6])
+        # the lobe runs clockwise
+        points = sector_polyline(tooth.points[::-1], teeth, first, count)
 
-    length = math.hypot(dx, dy)
+    return preview_solid(points, -height/2, height)
 
-    px = x + dy / length * outer_pin_radius
-    py = y - dx / length * outer_pin_radius
 
-    return (px, py)
+# keywords are the Cycloid properties in snake case
+def cycloid_shape(teeth=23, eccentricity=1, outer_diameter=52, pin_diameter=4, height=4, points_per_tooth=200, sampling_mode="Uniform", sampling_tolerance=0.001, generation_mode="Outline", start_angle=0, end_angle=360, bolt_circle_diameter=0, bolt_diameter=0, bolt_count=0, level_of_detail="Full", *, parts=None):
+    teeth = int(teeth)
+    eccentricity = float(eccentricity)
+    outer_diameter = float(outer_diameter)
+    pin_diameter = float(pin_diameter)
+    height = float(height)
+    points_per_tooth = int(points_per_tooth)
+    sampling_mode = str(sampling_mode)
+    sampling_tolerance = float(sampling_tolerance)
+    generation_mode = str(generation_mode)
+    bolts = (float(bolt_circle_diameter), float(bolt_diameter), int(bolt_count))
+    level_of_detail = str(level_of_detail)
 
-def tooth_edge(teeth, eccentricity, outer_diameter, pin_diameter, points_per_tooth):
-    teethp1 = teeth + 1
-    teethp1_ecc = eccentricity * teethp1
+    if parts is None:
+        parts = {}
     
-    outer_radius = outer_diameter / 2
-    pin_radius = pin_diameter / 2
+    # the first lobe runs from 90 degrees back one lobe
+    offset = 90 - 360/teeth
+    first, count = sector_teeth(teeth, float(start_angle), float(end_angle), offset)
+    sector = (offset + 360/teeth*first, offset + 360/teeth*(first + count))
 
-    radians_per_tooth = 2 * math.pi / teeth
+    profile = (teeth, eccentricity, outer_diameter, pin_diameter, points_per_tooth, sampling_mode, sampling_tolerance)
+    # a Preview extrudes a coarse polyline, without the tooth pattern
+    if level_of_detail == "Preview":
+        preview = (profile, first, count, height)
+        solid = memo(parts, "preview", preview, preview_disc, *preview)
+        with stage("holes"):
+            return bolt_circle_solid(solid, *bolts, *sector), {}
 
-    points = [None] * (points_per_tooth + 1)
-    
-    for p in range(points_per_tooth+1):
-        theta = spread(p / points_per_tooth, 0.65) * radians_per_tooth
-        
-        x, y = cycloid_point(theta, teethp1, eccentricity, teethp1_ecc, outer_radius, pin_radius)
-        
-        points[p] = App.Vector(x, y, 0)
-    
-    spline = Part.BSplineCurve()
-    spline.interpolate(points)
+    # a height edit only extrudes the kept face again
+    face = memo(parts, "profile", (profile, generation_mode, first, count), cycloid_face, profile, generation_mode, first, count).copy()
+    face.translate(App.Vector(0,0,-height/2))
+    with stage("extrude"):
+        solid = face.extrude(App.Vector(0, 0, height))
+
+    if generation_mode == "ToothPattern":
+        with stage("pattern"):
+            solid = pattern_solid(solid, teeth, count, first)
 
-    return spline.toShape()
+    with stage("holes"):
+        return bolt_circle_solid(solid, *bolts, *sector), {}
 
 
-class Cycloid:
+class Cycloid(Feature):
+    shape = staticmethod(cycloid_shape)
+
     def __init__(self, obj):
         obj.Proxy = self
         obj.addProperty("App::PropertyQuantity","Teeth").Teeth = 23
@@ -61,32 +117,18 @@ class Cycloid:
         obj.addProperty("App::PropertyLength","PinDiameter").PinDiameter = 4
         obj.addProperty("App::PropertyLength","Height").Height = 4
         obj.addProperty("App::PropertyQuantity","PointsPerTooth").PointsPerTooth = 200
-
-    def execute(self, obj):
-        teeth = int(obj.Teeth)
-        eccentricity = float(obj.Eccentricity)
-        outer_diameter = float(obj.OuterDiameter)
-        pin_diameter = float(obj.PinDiameter)
-        height = float(obj.Height)
-        points_per_tooth = int(obj.PointsPerTooth)
-        
-        edge = tooth_edge(teeth, eccentricity, outer_diameter, pin_diameter, points_per_tooth)
-        
-        center = App.Vector(0, 0, 0)
-        axis = App.Vector(0, 0, 1)
-        tooth_angle = 360/teeth
-        
-        edges = [edge]
-        for t in range(1, teeth):
-            edge_copy = edge.copy()
-            edge_copy.rotate(center, axis, t*tooth_angle)
-            edges.append(edge_copy)
-            
-        wire = Part.Wire(edges)
-        wire.translate(App.Vector(0,0,-height/2))
-        face = Part.Face(wire)
-     
-        obj.Shape = face.extrude(App.Vector(0, 0, height))
+        obj.addProperty("App::PropertyEnumeration","SamplingMode").SamplingMode = SAMPLING_MODES
+        obj.addProperty("App::PropertyLength","SamplingTolerance").SamplingTolerance = 0.001
+        obj.addProperty("App::PropertyEnumeration","GenerationMode").GenerationMode = GENERATION_MODES
+        # only the whole lobes between the angles are made
+        obj.addProperty("App::PropertyAngle","StartAngle").StartAngle = 0
+        obj.addProperty("App::PropertyAngle","EndAngle").EndAngle = 360
+        # 0 = no bolt holes, they are spread evenly over the sector
+        obj.addProperty("App::PropertyLength","BoltCircleDiameter").BoltCircleDiameter = 0
+        obj.addProperty("App::PropertyLength","BoltDiameter").BoltDiameter = 0
+        obj.addProperty("App::PropertyQuantity","BoltCount").BoltCount = 0
+        # Preview while editing, finalize.fcmacro sets Full
+        obj.addProperty("App::PropertyEnumeration","LevelOfDetail").LevelOfDetail = LEVELS_OF_DETAIL
 
 def make_cycloid():
     obj = App.ActiveDocument.addObject("Part::FeaturePython","Cycloid")
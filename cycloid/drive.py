@@ -0,0 +1,191 @@
+import math
+
+import Part
+import FreeCAD as App
+
+try:
+    from macro.common.feature import Feature, memo
+    from macro.common.timing import stage
+    from macro.kernel.sampling import SAMPLING_MODES
+    from macro.cycloid.cycloid import cycloid_face
+except ModuleNotFoundError:
+    from common.feature import Feature, memo
+    from common.timing import stage
+    from kernel.sampling import SAMPLING_MODES
+    from cycloid.cycloid import cycloid_face
+
+CENTER = App.Vector(0, 0, 0)
+ZAXIS = App.Vector(0, 0, 1)
+
+
+# the position the lobe math puts at angle, clockwise from +y
+def circle_point(radius, angle):
+    return App.Vector(radius * math.sin(angle), radius * math.cos(angle), 0)
+
+
+# cylinders of diameter around a circle, the first one on +y
+def pin_circle(count, circle_diameter, diameter, height):
+    with stage("pins"):
+        pin = Part.makeCylinder(diameter / 2, height)
+
+        pins = []
+        for k in range(count):
+            copy = pin.copy()
+            copy.translate(circle_point(circle_diameter / 2, 2 * math.pi * k / count))
+            pins.append(copy)
+
+        return Part.makeCompound(pins)
+
+
+def disc(face, holes, turn, height):
+    with stage("extrude"):
+        solid = face.copy().rotate(CENTER, ZAXIS, turn)
+        solid = solid.extrude(App.Vector(0, 0, height))
+    with stage("cut"):
+        return solid.cut(holes)
+
+
+def housing(pins, pin_circle_diameter, housing_diameter, height):
+    with stage("cut"):
+        ring = Part.makeCylinder(housing_diameter / 2, height).cut(
+            Part.makeCylinder(pin_circle_diameter / 2, height)
+        )
+        return ring.cut(pins)
+
+
+# keywords are the CycloidDrive properties in snake case. parts keeps the
+# sub parts between calls, each one is rebuilt only when its own inputs
+# change, so an eccentricity edit leaves the pins and the housing alone
+def drive_shape(
+    teeth=23,
+    eccentricity=1,
+    outer_diameter=52,
+    pin_diameter=4,
+    height=4,
+    disc_spacing=0.5,
+    points_per_tooth=200,
+    sampling_mode="Uniform",
+    sampling_tolerance=0.001,
+    output_holes=6,
+    output_circle_diameter=26,
+    output_pin_diameter=5,
+    housing_diameter=62,
+    *,
+    parts=None,
+):
+    teeth = int(teeth)
+    eccentricity = float(eccentricity)
+    outer_diameter = float(outer_diameter)
+    pin_diameter = float(pin_diameter)
+    height = float(height)
+    disc_spacing = float(disc_spacing)
+    points_per_tooth = int(points_per_tooth)
+    sampling_mode = str(sampling_mode)
+    sampling_tolerance = float(sampling_tolerance)
+    output_holes = int(output_holes)
+    output_circle_diameter = float(output_circle_diameter)
+    output_pin_diameter = float(output_pin_diameter)
+    housing_diameter = float(housing_diameter)
+
+    if parts is None:
+        parts = {}
+
+    profile = (
+        teeth,
+        eccentricity,
+        outer_diameter,
+        pin_diameter,
+        points_per_tooth,
+        sampling_mode,
+        sampling_tolerance,
+    )
+    stack = 2 * height + disc_spacing
+
+    hole_circle = (
+        output_holes,
+        output_circle_diameter,
+        # the holes clear the output pins as the disc wobbles
+        output_pin_diameter + 2 * eccentricity,
+        height,
+    )
+    pin_ring = (teeth + 1, outer_diameter, pin_diameter, stack)
+    output_circle = (
+        output_holes,
+        output_circle_diameter,
+        output_pin_diameter,
+        stack,
+    )
+
+    face = memo(
+        parts, "profile", profile, cycloid_face, profile, "Outline", 0, profile[0]
+    )
+    holes = memo(parts, "holes", hole_circle, pin_circle, *hole_circle)
+
+    # the second disc runs half a turn of the crank behind, that is the
+    # same outline turned by half a lobe on the other side of the axis,
+    # with the holes where they were so both drive the same output pins
+    discs = (profile, hole_circle)
+    first = memo(parts, "disc", discs, disc, face, holes, 0, height)
+    second = memo(parts, "counter_disc", discs, disc, face, holes, 180 / teeth, height)
+
+    pins = memo(parts, "pins", pin_ring, pin_circle, *pin_ring)
+    output_pins = memo(parts, "output_pins", output_circle, pin_circle, *output_circle)
+
+    first = first.copy()
+    first.translate(App.Vector(0, -eccentricity, 0))
+    second = second.copy()
+    second.translate(App.Vector(0, eccentricity, height + disc_spacing))
+
+    shapes = [first, second, pins, output_pins]
+    if housing_diameter > outer_diameter:
+        shapes.append(
+            memo(
+                parts,
+                "housing",
+                (pin_ring, housing_diameter),
+                housing,
+                pins,
+                outer_diameter,
+                housing_diameter,
+                stack,
+            )
+        )
+
+    return Part.makeCompound(shapes), {"ReductionRatio": teeth}
+
+
+class CycloidDrive(Feature):
+    shape = staticmethod(drive_shape)
+
+    def __init__(self, obj):
+        obj.Proxy = self
+        obj.addProperty("App::PropertyQuantity", "Teeth").Teeth = 23
+        obj.addProperty("App::PropertyLength", "Eccentricity").Eccentricity = 1
+        obj.addProperty("App::PropertyLength", "OuterDiameter").OuterDiameter = 52
+        obj.addProperty("App::PropertyLength", "PinDiameter").PinDiameter = 4
+        obj.addProperty("App::PropertyLength", "Height").Height = 4
+        obj.addProperty("App::PropertyLength", "DiscSpacing").DiscSpacing = 0.5
+        obj.addProperty("App::PropertyQuantity", "PointsPerTooth").PointsPerTooth = 200
+        obj.addProperty("App::PropertyEnumeration", "SamplingMode").SamplingMode = (
+            SAMPLING_MODES
+        )
+        obj.addProperty(
+            "App::PropertyLength", "SamplingTolerance"
+        ).SamplingTolerance = 0.001
+        obj.addProperty("App::PropertyQuantity", "OutputHoles").OutputHoles = 6
+        obj.addProperty(
+            "App::PropertyLength", "OutputCircleDiameter"
+        ).OutputCircleDiameter = 26
+        obj.addProperty(
+            "App::PropertyLength", "OutputPinDiameter"
+        ).OutputPinDiameter = 5
+        obj.addProperty("App::PropertyLength", "HousingDiameter").HousingDiameter = 62
+        obj.addProperty("App::PropertyQuantity", "ReductionRatio")
+        obj.setEditorMode("ReductionRatio", 1)
+
+
+def make_cycloid_drive():
+    obj = App.ActiveDocument.addObject("Part::FeaturePython", "CycloidDrive")
+    CycloidDrive(obj)
+    obj.ViewObject.Proxy = 0
+    App.ActiveDocument.recompute()
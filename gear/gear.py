@@ -1,47 +1,42 @@
 import Part
 import FreeCAD as App
 
-import numpy as np
-from scipy.optimize import least_squares, fsolve
 import math
 
-
-def mirror_x(v):
-    return App.Vector(-v.x, v.y, 0)
-
-
-# (t, 1)
-# rotate by t radians (or more for extra)
-
-
-def trochoid_point(
-    param, trochoid_beta, trochoid_distance, dedendum_radius, pitch_radius
-):
-    theta = trochoid_beta - param
-
-    cos_theta = math.cos(theta)
-    sin_theta = math.sin(theta)
-
-    temp = pitch_radius * param - trochoid_distance
-
-    x = dedendum_radius * sin_theta + temp * cos_theta
-    y = dedendum_radius * cos_theta - temp * sin_theta
-
-    return np.array([x, y])
-
-
-def involute_point(param, involute_beta, base_radius):
-    theta = involute_beta + param
-
-    cos_theta = math.cos(theta)
-    sin_theta = math.sin(theta)
-
-    temp = base_radius * param
-
-    x = temp * sin_theta + base_radius * cos_theta
-    y = temp * cos_theta - base_radius * sin_theta
-
-    return np.array([x, y])
+try:
+    from macro.common.cache import cached_edges
+    from macro.common.feature import Feature, memo
+    from macro.common.timing import stage
+    from macro.common.pattern import (
+        GENERATION_MODES,
+        bolt_circle_solid,
+        pattern_solid,
+        sector_edges,
+        sector_wire,
+    )
+    from macro.common.convert import to_vectors, profile_edges
+    from macro.common.detail import LEVELS_OF_DETAIL, PREVIEW_POINTS, polyline_wire
+    from macro.kernel.sampling import SAMPLING_MODES
+    from macro.kernel.geometry import pattern_points, sector_polyline, sector_teeth
+    from macro.kernel.gear import tooth_geometry, tooth_segments, tooth_samples
+    from macro.kernel.tooth import ToothProfile
+except ModuleNotFoundError:
+    from common.cache import cached_edges
+    from common.feature import Feature, memo
+    from common.timing import stage
+    from common.pattern import (
+        GENERATION_MODES,
+        bolt_circle_solid,
+        pattern_solid,
+        sector_edges,
+        sector_wire,
+    )
+    from common.convert import to_vectors, profile_edges
+    from common.detail import LEVELS_OF_DETAIL, PREVIEW_POINTS, polyline_wire
+    from kernel.sampling import SAMPLING_MODES
+    from kernel.geometry import pattern_points, sector_polyline, sector_teeth
+    from kernel.gear import tooth_geometry, tooth_segments, tooth_samples
+    from kernel.tooth import ToothProfile
 
 
 def tooth_edges(
@@ -53,279 +48,220 @@ def tooth_edges(
     addendum_factor,
     profile_shift_factor,
     points_per_tooth,
+    sampling_mode,
+    sampling_tolerance,
 ):
-    backlash = module * backlash_factor
-    profile_shift = module * profile_shift_factor
-    dedendum = module * dedendum_factor - profile_shift
-    addendum = module * addendum_factor + profile_shift
-
-    pitch_radius = module * teeth / 2
-    base_radius = pitch_radius * math.cos(pressure_angle)
-    dedendum_radius = pitch_radius - dedendum
-    addendum_radius = pitch_radius + addendum
-
-    tan_pressure = math.tan(pressure_angle)
-
-    delta_arc = 2 * profile_shift * tan_pressure - backlash
-    delta_angle = delta_arc / pitch_radius / 2
-
-    involute_beta = pressure_angle - tan_pressure - (math.pi / 2) / teeth - delta_angle
-    trochoid_beta = (math.pi / 2) - (math.pi / 2) / teeth - delta_angle
-
-    trochoid_distance = dedendum * tan_pressure
-
-    def func(
-        params,
-        trochoid_beta,
-        trochoid_distance,
-        dedendum_radius,
-        pitch_radius,
-        involute_beta,
-        base_radius,
-    ):
-        t1, t2 = params
-        p1 = trochoid_point(
-            t1, trochoid_beta, trochoid_distance, dedendum_radius, pitch_radius
+    with stage("solve"):
+        geometry = tooth_geometry(
+            teeth,
+            module,
+            pressure_angle,
+            backlash_factor,
+            dedendum_factor,
+            addendum_factor,
+            profile_shift_factor,
         )
-        p2 = involute_point(t2, involute_beta, base_radius)
-        return p1 - p2
-
-    initial_guess = [0.5, 0.5]
-    lower_bounds = [0, 0]
-    upper_bounds = [2, 2]
-    result = least_squares(
-        func,
-        initial_guess,
-        bounds=(lower_bounds, upper_bounds),
-        args=(
-            trochoid_beta,
-            trochoid_distance,
-            dedendum_radius,
-            pitch_radius,
-            involute_beta,
-            base_radius,
-        ),
-    )
-
-    if not result.success:
-        print("optimizer fail")
-
-    trochoid_end, involute_start = result.x
 
-    trochoid_start = trochoid_distance / pitch_radius
-    trochoid_step = (trochoid_end - trochoid_start) / points_per_tooth
-
-    trochoid_points = [None] * (points_per_tooth + 1)
-    for i in range(points_per_tooth + 1):
-        param = trochoid_start + i * trochoid_step
-
-        x, y = trochoid_point(
-            param, trochoid_beta, trochoid_distance, dedendum_radius, pitch_radius
+    with stage("sampling"):
+        segments = tooth_segments(
+            geometry, points_per_tooth, sampling_mode, sampling_tolerance
         )
 
-        trochoid_points[i] = App.Vector(x, y, 0)
-
-    trochoid = Part.BSplineCurve()
-    trochoid.interpolate(trochoid_points)
-    trochoid_edge = trochoid.toShape()
+    with stage("spline"):
+        return profile_edges(ToothProfile.from_segments(segments, teeth, mirrored=True))
 
-    involute_end = math.sqrt((addendum_radius / (base_radius)) ** 2 - 1)
 
-    _, involute_end_y = involute_point(involute_end, involute_beta, base_radius)
+OUTLINE_MODES = ["Exact", "Spline", "SplinePerTooth"]
 
-    keep_outer_arc = involute_end_y > 0
-    if involute_end_y < 0:
-        print("Involute clip before adendum")
 
-        def func(theta):
-            return (theta - involute_beta) * math.cos(theta) - math.sin(theta)
+# Spline fits the whole gear as one periodic curve, SplinePerTooth fits
+# one tooth within the tolerance and leaves the patterning to the caller
+def outline_edges(
+    teeth,
+    module,
+    pressure_angle,
+    backlash_factor,
+    dedendum_factor,
+    addendum_factor,
+    profile_shift_factor,
+    points_per_tooth,
+    sampling_mode,
+    sampling_tolerance,
+    outline_mode,
+    outline_tolerance,
+):
+    with stage("solve"):
+        geometry = tooth_geometry(
+            teeth,
+            module,
+            pressure_angle,
+            backlash_factor,
+            dedendum_factor,
+            addendum_factor,
+            profile_shift_factor,
+        )
 
-        theta_guess = involute_beta + involute_end
-        theta_solution = fsolve(func, theta_guess)[0]
+    with stage("sampling"):
+        samples = tooth_samples(
+            geometry, points_per_tooth, sampling_mode, sampling_tolerance
+        )
 
-        involute_end = theta_solution - involute_beta
+    with stage("spline"):
+        curve = Part.BSplineCurve()
+        if outline_mode == "Spline":
+            points = pattern_points(samples, teeth)
+            curve.interpolate(Points=to_vectors(points), PeriodicFlag=True)
+        else:
+            curve.approximate(
+                Points=to_vectors(samples),
+                DegMin=3,
+                DegMax=8,
+                Tolerance=outline_tolerance,
+            )
 
-    involute_step = (involute_end - involute_start) / points_per_tooth
+    return [curve.toShape()]
 
-    involute_points = [None] * (points_per_tooth + 1)
-    involute_points[0] = trochoid_points[-1]
-    for i in range(1, points_per_tooth + 1):
-        param = involute_start + i * involute_step
 
-        x, y = involute_point(param, involute_beta, base_radius)
+# largest distance from the exact tooth edges to the fitted outline
+def outline_deviation(exact_edges, outline_edge, samples_per_edge=32):
+    curve = outline_edge.Curve
 
-        involute_points[i] = App.Vector(x, y, 0)
+    deviation = 0
+    for edge in exact_edges:
+        for point in edge.discretize(samples_per_edge):
+            param = curve.parameter(point)
+            deviation = max(deviation, curve.value(param).distanceToPoint(point))
 
-    involute = Part.BSplineCurve()
-    involute.interpolate(involute_points)
-    involute_edge = involute.toShape()
+    return deviation
 
-    edges = [involute_edge, trochoid_edge]
 
-    if keep_outer_arc:
-        start = App.Vector(addendum_radius, 0)
-        midpoint = involute_points[-1].add(start).multiply(0.5)
+HELIX_METHODS = ["PipeShell", "Loft", "RuledLoft"]
 
-        center_arc = Part.Arc(
-            start,
-            midpoint.normalize().multiply(addendum_radius),
-            involute_points[-1],
-        )
-        edges = [center_arc.toShape()] + edges
 
-    last_point = App.Vector(trochoid_points[0].x, trochoid_points[0].y, 0)
+def helix_twist(lead, height, reverse_helix):
+    twist = 360 * height / lead
+    if reverse_helix:
+        return -twist
+    return twist
 
-    half_ang = math.pi / teeth
-    center_dedendum = App.Vector(math.cos(half_ang), math.sin(half_ang), 0).multiply(
-        dedendum_radius
-    )
-    midpoint = (last_point.add(center_dedendum)).multiply(0.5)
 
-    end_arc = Part.Arc(
-        last_point, midpoint.normalize().multiply(dedendum_radius), center_dedendum
-    )
-    edges.append(end_arc.toShape())
+# copies of the profile turned along the helix from z = 0 up to height,
+# the same path the frenet pipe shell takes the profile along
+def helix_sections(wire, lead, height, reverse_helix, count):
+    twist = helix_twist(lead, height, reverse_helix)
 
     center = App.Vector(0, 0, 0)
-    xaxis = App.Vector(1, 0, 0)
     zaxis = App.Vector(0, 0, 1)
 
-    new = edges.copy()
-    num_edges = len(edges)
-    for i in range(num_edges):
-        new.append(
-            edges[num_edges - 1 - i]
-            .copy()
-            .rotate(center, xaxis, 180)
-            .rotate(center, zaxis, 360 / teeth)
-        )
-
-    return new
-
-
-class Gear:
-    def __init__(self, obj):
-        obj.Proxy = self
-        obj.addProperty("App::PropertyQuantity", "Teeth").Teeth = 12
-        obj.addProperty("App::PropertyLength", "Module").Module = 2
-        obj.addProperty("App::PropertyLength", "Height").Height = 6
-        obj.addProperty("App::PropertyAngle", "HelixAngle").HelixAngle = 0
-        obj.addProperty("App::PropertyBool", "DoubleHelix").DoubleHelix = True
-        obj.addProperty("App::PropertyBool", "ReverseHelix").ReverseHelix = False
-        obj.addProperty("App::PropertyAngle", "PressureAngle").PressureAngle = 20
-        obj.addProperty("App::PropertyQuantity", "BacklashFactor").BacklashFactor = 0
-        obj.addProperty("App::PropertyQuantity", "DedendumFactor").DedendumFactor = 1.25
-        obj.addProperty("App::PropertyQuantity", "AddendumFactor").AddendumFactor = 1
-        obj.addProperty(
-            "App::PropertyQuantity", "ProfileShiftFactor"
-        ).ProfileShiftFactor = 0
-        obj.addProperty("App::PropertyQuantity", "PointsPerTooth").PointsPerTooth = 40
-        obj.addProperty("App::PropertyLength", "SecondRadius").SecondRadius = 0
-        obj.addProperty("App::PropertyQuantity", "TeethOverride").TeethOverride = 0
+    sections = []
+    for i in range(count + 1):
+        fraction = i / count
+        section = wire.copy()
+        section.rotate(center, zaxis, twist * fraction)
+        section.translate(App.Vector(0, 0, height * fraction))
+        sections.append(section)
 
-    def execute(self, obj):
-        teeth = int(obj.Teeth)
-        module = float(obj.Module)
-        height = float(obj.Height)
-        helix_angle = math.radians(float(obj.HelixAngle))
-        double_helix = bool(obj.DoubleHelix)
-        reverse_helix = bool(obj.ReverseHelix)
-        pressure_angle = math.radians(float(obj.PressureAngle))
-        backlash_factor = float(obj.BacklashFactor)
-        dedendum_factor = float(obj.DedendumFactor)
-        addendum_factor = float(obj.AddendumFactor)
-        profile_shift_factor = float(obj.ProfileShiftFactor)
-        points_per_tooth = int(obj.PointsPerTooth)
-        second_radius = float(obj.SecondRadius)
-        teeth_override = int(obj.TeethOverride)
-
-        internal = second_radius > teeth * module / 2
-        if internal:
-            addendum_factor, dedendum_factor = dedendum_factor, addendum_factor
-            backlash_factor = -backlash_factor
-
-        edges = tooth_edges(
-            teeth,
-            module,
-            pressure_angle,
-            backlash_factor,
-            dedendum_factor,
-            addendum_factor,
-            profile_shift_factor,
-            points_per_tooth,
-        )
+    return sections
 
-        pitch_radius = teeth * module / 2
-        profile_shift = module * profile_shift_factor
-        addendum = module * addendum_factor + profile_shift
-        addendum_radius = pitch_radius + addendum
 
-        angle_per_tooth = 360 / teeth
+# distance from the true helix of the outermost profile point to the loft,
+# checked halfway between sections where the loft strays the most
+def measure_helix_deviation(wire, loft, lead, height, reverse_helix, count):
+    twist = helix_twist(lead, height, reverse_helix)
+    outer = max((vertex.Point for vertex in wire.Vertexes), key=lambda p: p.Length)
 
-        center = App.Vector(0, 0, 0)
-        xaxis = App.Vector(1, 0, 0)
-        zaxis = App.Vector(0, 0, 1)
+    center = App.Vector(0, 0, 0)
+    zaxis = App.Vector(0, 0, 1)
 
-        edges_copy = edges.copy()
+    deviation = 0
+    for i in range(count):
+        fraction = (i + 0.5) / count
+        vertex = Part.Vertex(outer)
+        vertex.rotate(center, zaxis, twist * fraction)
+        vertex.translate(App.Vector(0, 0, height * fraction))
+        deviation = max(deviation, vertex.distToShape(loft)[0])
 
-        if teeth_override != 0:
-            teeth = teeth_override
+    return deviation
 
-        for t in range(1, teeth):
-            angle = t * angle_per_tooth
-            for edge in edges_copy:
-                edge_copy = edge.copy()
-                edge_copy.rotate(center, zaxis, angle)
-                edges.append(edge_copy)
 
-        if teeth_override != 0:
-            last = Part.makeLine(
-                App.Vector(second_radius, 0, 0), App.Vector(addendum_radius, 0, 0)
+# the face of a closed outline at z = 0, with the second radius bore, or the
+# rim outside an internal gear
+def profile_face(wire, second_radius, internal):
+    with stage("face"):
+        if second_radius != 0:
+            circle = Part.Circle(
+                App.Vector(0, 0, 0), App.Vector(0, 0, -1), second_radius
             )
-            first = last.copy().rotate(center, zaxis, angle_per_tooth * teeth)
-            edges.append(first)
-            if second_radius != 0:
-                p1, p2 = first.Vertexes[0].Point, last.Vertexes[0].Point
-                midpoint = p1.add(p2).multiply(0.5)
-                arc = Part.Arc(p1, midpoint.normalize().multiply(second_radius), p2)
-                edges.append(arc.toShape())
-
-            edges.append(last)
-
-        wire = Part.Wire(edges)
-
-        heightd2 = height / 2
-
-        if helix_angle == 0:
-            wire.translate(App.Vector(0, 0, -heightd2))
+            circle_wire = Part.Wire([circle.toShape()])
+            if internal:
+                return Part.Face([circle_wire, wire])
+            return Part.Face([wire, circle_wire])
+        return Part.Face(wire)
+
+
+# extrude or sweep a gear profile wire lying at z = 0 into a solid centered
+# on z = 0, a second radius adds the bore (or the rim for internal gears),
+# a single helix gets its lower half by flipping the upper half around
+# flip_axis, which has to be a symmetry line of the profile. face is the
+# profile_face of the wire when the caller kept it from an earlier build
+def gear_solid(
+    wire,
+    height,
+    second_radius,
+    internal,
+    lead,
+    double_helix,
+    reverse_helix,
+    helix_method,
+    helix_section_count,
+    flip_axis=App.Vector(1, 0, 0),
+    face=None,
+):
+    center = App.Vector(0, 0, 0)
+    zaxis = App.Vector(0, 0, 1)
 
-            if second_radius != 0 and teeth_override == 0:
-                circle = Part.Circle(
-                    App.Vector(0, 0, -heightd2), App.Vector(0, 0, -1), second_radius
-                )
-                circle_wire = Part.Wire([circle.toShape()])
-                if internal:
-                    face = Part.Face([circle_wire, wire])
-                else:
-                    face = Part.Face([wire, circle_wire])
+    heightd2 = height / 2
+
+    if lead is None:
+        helix_deviation = 0
+        if face is None:
+            face = profile_face(wire, second_radius, internal)
+        face = face.copy()
+        face.translate(App.Vector(0, 0, -heightd2))
+
+        with stage("extrude"):
+            return face.extrude(App.Vector(0, 0, height)), helix_deviation
+    else:
+        with stage("sweep"):
+            if helix_method == "PipeShell":
+                helix = Part.makeHelix(lead, heightd2, 1, 0, reverse_helix)
+
+                pipe_shell = Part.BRepOffsetAPI.MakePipeShell(helix)
+                pipe_shell.setFrenetMode(True)
+                pipe_shell.add(wire)
+                pipe_shell.build()
+
+                wire_top = pipe_shell.lastShape()
+                side_faces = pipe_shell.shape().Faces
             else:
-                face = Part.Face(wire)
-
-            obj.Shape = face.extrude(App.Vector(0, 0, height))
-        else:
-            lead = 2 * math.pi * pitch_radius / math.tan(helix_angle)
-
-            helix = Part.makeHelix(lead, heightd2, 1, 0, reverse_helix)
+                sections = helix_sections(
+                    wire, lead, heightd2, reverse_helix, max(1, helix_section_count)
+                )
+                loft = Part.makeLoft(sections, False, helix_method == "RuledLoft")
 
-            pipe_shell = Part.BRepOffsetAPI.MakePipeShell(helix)
-            pipe_shell.setFrenetMode(True)
-            pipe_shell.add(wire)
-            pipe_shell.build()
+                wire_top = sections[-1]
+                side_faces = loft.Faces
 
-            wire_top = pipe_shell.lastShape()
+        helix_deviation = 0
+        if helix_method != "PipeShell":
+            with stage("check"):
+                helix_deviation = measure_helix_deviation(
+                    wire, loft, lead, heightd2, reverse_helix, len(sections) - 1
+                )
 
-            shell_faces = []
-            if second_radius == 0 or teeth_override != 0:
+        shell_faces = []
+        with stage("face"):
+            if second_radius == 0:
                 face_top = Part.Face([wire_top])
             else:
                 circle = Part.Circle(
@@ -341,19 +277,318 @@ class Gear:
                 else:
                     face_top = Part.Face([wire_top, circle_wire])
 
-            shell_top = pipe_shell.shape().Faces + [face_top]
+        with stage("solid"):
+            shell_top = side_faces + [face_top]
             shell_faces += shell_top.copy()
 
             for face in shell_top:
                 if double_helix:
                     new_face = face.mirror(center, zaxis)
                 else:
-                    new_face = face.copy().rotate(center, xaxis, 180)
+                    new_face = face.copy().rotate(center, flip_axis, 180)
                 shell_faces.append(new_face)
 
             shell = Part.makeShell(shell_faces)
 
-            obj.Shape = Part.makeSolid(shell)
+            return Part.makeSolid(shell), helix_deviation
+
+
+# the closed outline (or the closed sector of one tooth for ToothPattern),
+# the outline deviation and the radius left for the bore. a partial gear of
+# count teeth from tooth first on closes its outline through the second
+# radius itself, only its own teeth are patterned
+def gear_profile(
+    profile,
+    outline_mode,
+    outline_tolerance,
+    second_radius,
+    first,
+    count,
+    generation_mode,
+):
+    teeth = profile[0]
+    partial = count != teeth
+    edges = cached_edges("gear", tooth_edges, profile)
+
+    # a sector or a single tooth can not be cut from one periodic curve
+    if outline_mode == "Spline" and (partial or generation_mode == "ToothPattern"):
+        outline_mode = "SplinePerTooth"
+
+    deviation = 0
+    if outline_mode != "Exact":
+        outline = cached_edges(
+            "gear_outline",
+            outline_edges,
+            profile + (outline_mode, outline_tolerance),
+        )
+        with stage("check"):
+            deviation = outline_deviation(edges, outline[0])
+        if deviation > outline_tolerance:
+            print("Outline deviation", deviation, "above tolerance")
+        edges = outline
+
+    if generation_mode == "ToothPattern":
+        with stage("wire"):
+            return sector_wire(edges, second_radius), deviation, 0
+
+    with stage("wire"):
+        # the periodic outline already holds every tooth
+        if outline_mode != "Spline":
+            edges = sector_edges(edges, teeth, first, count)
+
+        if partial:
+            middle = (first + count / 2) * 360 / teeth
+            return sector_wire(edges, second_radius, middle), deviation, 0
+
+        return Part.Wire(edges), deviation, second_radius
+
+
+# a coarse polyline of count teeth from tooth first on for a Preview, closed
+# through radius when they are not every tooth
+def preview_wire(profile, first, count, radius):
+    with stage("sampling"):
+        samples = tooth_samples(
+            tooth_geometry(*profile[:7]), PREVIEW_POINTS, "Uniform", profile[9]
+        )
+        points = sector_polyline(
+            samples, profile[0], first, count, radius, PREVIEW_POINTS
+        )
+
+    return polyline_wire(points)
+
+
+# keywords are the Gear properties in snake case, angles in degrees. returns
+# the shape and the values of the read only output properties
+def gear_shape(
+    teeth=12,
+    module=2,
+    height=6,
+    helix_angle=0,
+    double_helix=True,
+    reverse_helix=False,
+    pressure_angle=20,
+    backlash_factor=0,
+    dedendum_factor=1.25,
+    addendum_factor=1,
+    profile_shift_factor=0,
+    points_per_tooth=40,
+    sampling_mode="Uniform",
+    sampling_tolerance=0.001,
+    second_radius=0,
+    teeth_override=0,
+    outline_mode="Exact",
+    outline_tolerance=0.001,
+    helix_method="PipeShell",
+    helix_sections=4,
+    generation_mode="Outline",
+    start_angle=0,
+    end_angle=360,
+    bolt_circle_diameter=0,
+    bolt_diameter=0,
+    bolt_count=0,
+    level_of_detail="Full",
+    *,
+    parts=None,
+):
+    teeth = int(teeth)
+    module = float(module)
+    height = float(height)
+    helix_angle = math.radians(float(helix_angle))
+    double_helix = bool(double_helix)
+    reverse_helix = bool(reverse_helix)
+    pressure_angle = math.radians(float(pressure_angle))
+    backlash_factor = float(backlash_factor)
+    dedendum_factor = float(dedendum_factor)
+    addendum_factor = float(addendum_factor)
+    profile_shift_factor = float(profile_shift_factor)
+    points_per_tooth = int(points_per_tooth)
+    sampling_mode = str(sampling_mode)
+    sampling_tolerance = float(sampling_tolerance)
+    second_radius = float(second_radius)
+    teeth_override = int(teeth_override)
+    outline_mode = str(outline_mode)
+    outline_tolerance = float(outline_tolerance)
+    helix_method = str(helix_method)
+    helix_section_count = int(helix_sections)
+    generation_mode = str(generation_mode)
+    bolts = (float(bolt_circle_diameter), float(bolt_diameter), int(bolt_count))
+    level_of_detail = str(level_of_detail)
+
+    if parts is None:
+        parts = {}
+
+    # TeethOverride keeps the teeth from angle 0 on
+    if teeth_override != 0:
+        first, count = 0, teeth_override
+    else:
+        first, count = sector_teeth(teeth, float(start_angle), float(end_angle))
+    sector = (360 / teeth * first, 360 / teeth * (first + count))
+
+    internal = second_radius > teeth * module / 2
+    if internal:
+        addendum_factor, dedendum_factor = dedendum_factor, addendum_factor
+        backlash_factor = -backlash_factor
+
+    profile = (
+        teeth,
+        module,
+        pressure_angle,
+        backlash_factor,
+        dedendum_factor,
+        addendum_factor,
+        profile_shift_factor,
+        points_per_tooth,
+        sampling_mode,
+        sampling_tolerance,
+    )
+    # a Preview extrudes a coarse polyline straight, without the helix, the
+    # outline fit or the tooth pattern
+    if level_of_detail == "Preview":
+        # a sector closes through the second radius, a full gear gets a bore
+        radius, bore_radius = 0, second_radius
+        if count != teeth:
+            radius, bore_radius = second_radius, 0
+        preview = (profile, first, count, radius)
+        wire = memo(parts, "preview", preview, preview_wire, *preview)
+        shape, _ = gear_solid(
+            wire,
+            height,
+            bore_radius,
+            internal,
+            None,
+            double_helix,
+            reverse_helix,
+            helix_method,
+            helix_section_count,
+        )
+        with stage("holes"):
+            return bolt_circle_solid(shape, *bolts, *sector), {}
+
+    outline = (
+        profile,
+        outline_mode,
+        outline_tolerance,
+        second_radius,
+        first,
+        count,
+        generation_mode,
+    )
+
+    # height and the helix only change the body, the profile stage and its
+    # face are kept between builds while outline holds the same values
+    wire, deviation, bore_radius = memo(
+        parts, "profile", outline, gear_profile, *outline
+    )
+
+    pitch_radius = teeth * module / 2
+
+    lead = None
+    if helix_angle != 0:
+        lead = 2 * math.pi * pitch_radius / math.tan(helix_angle)
+
+    face = None
+    if lead is None:
+        face = memo(parts, "face", outline, profile_face, wire, bore_radius, internal)
+
+    if generation_mode == "ToothPattern":
+        half_ang = math.pi / teeth
+        tooth, helix_deviation = gear_solid(
+            wire.copy(),
+            height,
+            0,
+            internal,
+            lead,
+            double_helix,
+            reverse_helix,
+            helix_method,
+            helix_section_count,
+            App.Vector(math.cos(half_ang), math.sin(half_ang), 0),
+            face,
+        )
+        with stage("pattern"):
+            shape = pattern_solid(tooth, teeth, count, first)
+        with stage("holes"):
+            shape = bolt_circle_solid(shape, *bolts, *sector)
+        return shape, {"OutlineDeviation": deviation, "HelixDeviation": helix_deviation}
+
+    # a single helix flips its upper half about the middle of the sector
+    middle = math.radians(sum(sector) / 2)
+    shape, helix_deviation = gear_solid(
+        wire.copy(),
+        height,
+        bore_radius,
+        internal,
+        lead,
+        double_helix,
+        reverse_helix,
+        helix_method,
+        helix_section_count,
+        App.Vector(math.cos(middle), math.sin(middle), 0),
+        face,
+    )
+    with stage("holes"):
+        shape = bolt_circle_solid(shape, *bolts, *sector)
+    return shape, {"OutlineDeviation": deviation, "HelixDeviation": helix_deviation}
+
+
+class Gear(Feature):
+    shape = staticmethod(gear_shape)
+
+    def __init__(self, obj):
+        obj.Proxy = self
+        obj.addProperty("App::PropertyQuantity", "Teeth").Teeth = 12
+        obj.addProperty("App::PropertyLength", "Module").Module = 2
+        obj.addProperty("App::PropertyLength", "Height").Height = 6
+        obj.addProperty("App::PropertyAngle", "HelixAngle").HelixAngle = 0
+        obj.addProperty("App::PropertyBool", "DoubleHelix").DoubleHelix = True
+        obj.addProperty("App::PropertyBool", "ReverseHelix").ReverseHelix = False
+        obj.addProperty("App::PropertyAngle", "PressureAngle").PressureAngle = 20
+        obj.addProperty("App::PropertyQuantity", "BacklashFactor").BacklashFactor = 0
+        obj.addProperty("App::PropertyQuantity", "DedendumFactor").DedendumFactor = 1.25
+        obj.addProperty("App::PropertyQuantity", "AddendumFactor").AddendumFactor = 1
+        obj.addProperty(
+            "App::PropertyQuantity", "ProfileShiftFactor"
+        ).ProfileShiftFactor = 0
+        obj.addProperty("App::PropertyQuantity", "PointsPerTooth").PointsPerTooth = 40
+        obj.addProperty("App::PropertyEnumeration", "SamplingMode").SamplingMode = (
+            SAMPLING_MODES
+        )
+        obj.addProperty(
+            "App::PropertyLength", "SamplingTolerance"
+        ).SamplingTolerance = 0.001
+        obj.addProperty("App::PropertyLength", "SecondRadius").SecondRadius = 0
+        obj.addProperty("App::PropertyQuantity", "TeethOverride").TeethOverride = 0
+        obj.addProperty("App::PropertyEnumeration", "OutlineMode").OutlineMode = (
+            OUTLINE_MODES
+        )
+        obj.addProperty("App::PropertyLength", "OutlineTolerance").OutlineTolerance = (
+            0.001
+        )
+        obj.addProperty("App::PropertyLength", "OutlineDeviation")
+        obj.setEditorMode("OutlineDeviation", 1)
+        obj.addProperty("App::PropertyEnumeration", "HelixMethod").HelixMethod = (
+            HELIX_METHODS
+        )
+        obj.addProperty("App::PropertyQuantity", "HelixSections").HelixSections = 4
+        obj.addProperty("App::PropertyLength", "HelixDeviation")
+        obj.setEditorMode("HelixDeviation", 1)
+        obj.addProperty("App::PropertyEnumeration", "GenerationMode").GenerationMode = (
+            GENERATION_MODES
+        )
+        # only the whole teeth between the angles are made, TeethOverride
+        # takes precedence
+        obj.addProperty("App::PropertyAngle", "StartAngle").StartAngle = 0
+        obj.addProperty("App::PropertyAngle", "EndAngle").EndAngle = 360
+        # 0 = no bolt holes, they are spread evenly over the sector
+        obj.addProperty(
+            "App::PropertyLength", "BoltCircleDiameter"
+        ).BoltCircleDiameter = 0
+        obj.addProperty("App::PropertyLength", "BoltDiameter").BoltDiameter = 0
+        obj.addProperty("App::PropertyQuantity", "BoltCount").BoltCount = 0
+        # Preview while editing, finalize.fcmacro sets Full
+        obj.addProperty("App::PropertyEnumeration", "LevelOfDetail").LevelOfDetail = (
+            LEVELS_OF_DETAIL
+        )
 
 
 def make_gear():
@@ -0,0 +1,161 @@
+import math
+
+import numpy as np
+
+try:
+    from macro.kernel.sampling import adaptive_params, unit_tangents
+    from macro.kernel.geometry import pattern_points, spline_segment
+    from macro.kernel.tooth import ToothProfile
+except ModuleNotFoundError:
+    from kernel.sampling import adaptive_params, unit_tangents
+    from kernel.geometry import pattern_points, spline_segment
+    from kernel.tooth import ToothProfile
+
+
+def spread(input, curvature):
+    x = input * 2 - 1
+    mapped = (x - curvature * x) / (curvature - 2 * curvature * np.abs(x) + 1)
+    return (mapped + 1) / 2
+
+
+def cycloid_points(
+    thetas, teethp1, eccentricity, teethp1_ecc, outer_radius, outer_pin_radius
+):
+    sin_theta = np.sin(thetas)
+    cos_theta = np.cos(thetas)
+
+    teethp1_theta = teethp1 * thetas
+    sin_teethp1_theta = np.sin(teethp1_theta)
+    cos_teethp1_theta = np.cos(teethp1_theta)
+
+    x = outer_radius * sin_theta + eccentricity * sin_teethp1_theta
+    y = outer_radius * cos_theta + eccentricity * cos_teethp1_theta
+
+    dx = outer_radius * cos_theta + teethp1_ecc * cos_teethp1_theta
+    dy = -outer_radius * sin_theta - teethp1_ecc * sin_teethp1_theta
+
+    length = np.hypot(dx, dy)
+
+    px = x + dy / length * outer_pin_radius
+    py = y - dx / length * outer_pin_radius
+
+    return np.column_stack((px, py))
+
+
+# derivative of the pin offset curve, the offset turns with the unit tangent
+def cycloid_derivatives(
+    thetas, teethp1, eccentricity, teethp1_ecc, outer_radius, outer_pin_radius
+):
+    sin_theta = np.sin(thetas)
+    cos_theta = np.cos(thetas)
+
+    teethp1_theta = teethp1 * thetas
+    sin_teethp1_theta = np.sin(teethp1_theta)
+    cos_teethp1_theta = np.cos(teethp1_theta)
+
+    dx = outer_radius * cos_theta + teethp1_ecc * cos_teethp1_theta
+    dy = -outer_radius * sin_theta - teethp1_ecc * sin_teethp1_theta
+
+    ddx = -outer_radius * sin_theta - teethp1 * teethp1_ecc * sin_teethp1_theta
+    ddy = -outer_radius * cos_theta - teethp1 * teethp1_ecc * cos_teethp1_theta
+
+    length = np.hypot(dx, dy)
+    tx = dx / length
+    ty = dy / length
+
+    along = tx * ddx + ty * ddy
+    dtx = (ddx - tx * along) / length
+    dty = (ddy - ty * along) / length
+
+    return np.column_stack((dx + dty * outer_pin_radius, dy - dtx * outer_pin_radius))
+
+
+# one lobe as a spline segment. Adaptive ignores points_per_tooth and places
+# as few samples as keep the lobe within sampling_tolerance
+def tooth_segment(
+    teeth,
+    eccentricity,
+    outer_diameter,
+    pin_diameter,
+    points_per_tooth,
+    sampling_mode,
+    sampling_tolerance,
+):
+    teethp1 = teeth + 1
+    teethp1_ecc = eccentricity * teethp1
+
+    outer_radius = outer_diameter / 2
+    pin_radius = pin_diameter / 2
+
+    radians_per_tooth = 2 * math.pi / teeth
+
+    args = (teethp1, eccentricity, teethp1_ecc, outer_radius, pin_radius)
+
+    if sampling_mode == "Adaptive":
+        thetas = adaptive_params(
+            lambda thetas: cycloid_points(thetas, *args),
+            lambda thetas: cycloid_derivatives(thetas, *args),
+            0,
+            radians_per_tooth,
+            sampling_tolerance,
+        )
+        tangents = unit_tangents(
+            cycloid_derivatives(thetas, *args), cycloid_points(thetas, *args)
+        )
+    else:
+        thetas = (
+            spread(np.arange(points_per_tooth + 1) / points_per_tooth, 0.65)
+            * radians_per_tooth
+        )
+        tangents = None
+
+    return spline_segment(cycloid_points(thetas, *args), tangents)
+
+
+# one lobe, keywords match cycloid_shape
+def cycloid_tooth(
+    teeth=23,
+    eccentricity=1,
+    outer_diameter=52,
+    pin_diameter=4,
+    points_per_tooth=200,
+    sampling_mode="Uniform",
+    sampling_tolerance=0.001,
+):
+    segment = tooth_segment(
+        int(teeth),
+        float(eccentricity),
+        float(outer_diameter),
+        float(pin_diameter),
+        int(points_per_tooth),
+        str(sampling_mode),
+        float(sampling_tolerance),
+    )
+    return ToothProfile.from_segments([segment], int(teeth))
+
+
+def cycloid_segments(
+    teeth=23,
+    eccentricity=1,
+    outer_diameter=52,
+    pin_diameter=4,
+    points_per_tooth=200,
+    sampling_mode="Uniform",
+    sampling_tolerance=0.001,
+):
+    return cycloid_tooth(
+        teeth,
+        eccentricity,
+        outer_diameter,
+        pin_diameter,
+        points_per_tooth,
+        sampling_mode,
+        sampling_tolerance,
+    ).segments()
+
+
+# the closed outline of the whole cycloid disc, the last point joins the first
+def cycloid_polyline(teeth=23, **cycloid):
+    tooth = cycloid_tooth(teeth, **cycloid)
+    # the lobe runs clockwise
+    return pattern_points(tooth.points[::-1], int(teeth))
@@ -0,0 +1,608 @@
+import math
+
+import numpy as np
+
+try:
+    from macro.kernel.sampling import adaptive_params, unit_tangents
+    from macro.kernel.geometry import (
+        arc_points,
+        origin_arc_segment,
+        pattern_points,
+        reverse_segment,
+        spline_segment,
+    )
+    from macro.kernel.tooth import ToothProfile
+except ModuleNotFoundError:
+    from kernel.sampling import adaptive_params, unit_tangents
+    from kernel.geometry import (
+        arc_points,
+        origin_arc_segment,
+        pattern_points,
+        reverse_segment,
+        spline_segment,
+    )
+    from kernel.tooth import ToothProfile
+
+
+def trochoid_point(
+    param, trochoid_beta, trochoid_distance, dedendum_radius, pitch_radius
+):
+    theta = trochoid_beta - param
+
+    cos_theta = math.cos(theta)
+    sin_theta = math.sin(theta)
+
+    temp = pitch_radius * param - trochoid_distance
+
+    x = dedendum_radius * sin_theta + temp * cos_theta
+    y = dedendum_radius * cos_theta - temp * sin_theta
+
+    return np.array([x, y])
+
+
+def involute_point(param, involute_beta, base_radius):
+    theta = involute_beta + param
+
+    cos_theta = math.cos(theta)
+    sin_theta = math.sin(theta)
+
+    temp = base_radius * param
+
+    x = temp * sin_theta + base_radius * cos_theta
+    y = temp * cos_theta - base_radius * sin_theta
+
+    return np.array([x, y])
+
+
+def trochoid_points(
+    params, trochoid_beta, trochoid_distance, dedendum_radius, pitch_radius
+):
+    theta = trochoid_beta - params
+
+    cos_theta = np.cos(theta)
+    sin_theta = np.sin(theta)
+
+    temp = pitch_radius * params - trochoid_distance
+
+    x = dedendum_radius * sin_theta + temp * cos_theta
+    y = dedendum_radius * cos_theta - temp * sin_theta
+
+    return np.column_stack((x, y))
+
+
+def involute_points(params, involute_beta, base_radius):
+    theta = involute_beta + params
+
+    cos_theta = np.cos(theta)
+    sin_theta = np.sin(theta)
+
+    temp = base_radius * params
+
+    x = temp * sin_theta + base_radius * cos_theta
+    y = temp * cos_theta - base_radius * sin_theta
+
+    return np.column_stack((x, y))
+
+
+def trochoid_derivative(
+    param, trochoid_beta, trochoid_distance, dedendum_radius, pitch_radius
+):
+    theta = trochoid_beta - param
+
+    cos_theta = math.cos(theta)
+    sin_theta = math.sin(theta)
+
+    temp = pitch_radius * param - trochoid_distance
+    radius_diff = pitch_radius - dedendum_radius
+
+    dx = radius_diff * cos_theta + temp * sin_theta
+    dy = temp * cos_theta - radius_diff * sin_theta
+
+    return np.array([dx, dy])
+
+
+def trochoid_derivatives(
+    params, trochoid_beta, trochoid_distance, dedendum_radius, pitch_radius
+):
+    theta = trochoid_beta - params
+
+    cos_theta = np.cos(theta)
+    sin_theta = np.sin(theta)
+
+    temp = pitch_radius * params - trochoid_distance
+    radius_diff = pitch_radius - dedendum_radius
+
+    dx = radius_diff * cos_theta + temp * sin_theta
+    dy = temp * cos_theta - radius_diff * sin_theta
+
+    return np.column_stack((dx, dy))
+
+
+def involute_derivatives(params, involute_beta, base_radius):
+    theta = involute_beta + params
+
+    temp = base_radius * params
+
+    dx = temp * np.cos(theta)
+    dy = -temp * np.sin(theta)
+
+    return np.column_stack((dx, dy))
+
+
+def involute_derivative(param, involute_beta, base_radius):
+    theta = involute_beta + param
+
+    temp = base_radius * param
+
+    dx = temp * math.cos(theta)
+    dy = -temp * math.sin(theta)
+
+    return np.array([dx, dy])
+
+
+def intersection_residual(
+    params,
+    trochoid_beta,
+    trochoid_distance,
+    dedendum_radius,
+    pitch_radius,
+    involute_beta,
+    base_radius,
+):
+    t1, t2 = params
+    p1 = trochoid_point(
+        t1, trochoid_beta, trochoid_distance, dedendum_radius, pitch_radius
+    )
+    p2 = involute_point(t2, involute_beta, base_radius)
+    return p1 - p2
+
+
+def intersection_jacobian(
+    params,
+    trochoid_beta,
+    trochoid_distance,
+    dedendum_radius,
+    pitch_radius,
+    involute_beta,
+    base_radius,
+):
+    t1, t2 = params
+    d1 = trochoid_derivative(
+        t1, trochoid_beta, trochoid_distance, dedendum_radius, pitch_radius
+    )
+    d2 = involute_derivative(t2, involute_beta, base_radius)
+    return np.column_stack((d1, -d2))
+
+
+# walk both curves outward from the base circle crossing, matching them
+# by radius, and take the first point where their polar angles meet
+def intersection_guess(
+    trochoid_beta,
+    trochoid_distance,
+    dedendum_radius,
+    pitch_radius,
+    involute_beta,
+    base_radius,
+    addendum_radius,
+    samples=32,
+):
+    low_radius = max(base_radius, dedendum_radius)
+    high_radius = max(addendum_radius, low_radius)
+
+    involute_low = math.sqrt((low_radius / base_radius) ** 2 - 1)
+    involute_high = math.sqrt((high_radius / base_radius) ** 2 - 1)
+    involute_params = np.linspace(involute_low, involute_high, samples)
+
+    radii_squared = base_radius**2 * (1 + involute_params**2)
+    temp = np.sqrt(np.maximum(radii_squared - dedendum_radius**2, 0))
+    trochoid_params = (trochoid_distance + temp) / pitch_radius
+
+    p1 = trochoid_points(
+        trochoid_params, trochoid_beta, trochoid_distance, dedendum_radius, pitch_radius
+    )
+    p2 = involute_points(involute_params, involute_beta, base_radius)
+
+    cross = p1[:, 0] * p2[:, 1] - p1[:, 1] * p2[:, 0]
+    dot = p1[:, 0] * p2[:, 0] + p1[:, 1] * p2[:, 1]
+    angle_diff = np.arctan2(cross, dot)
+
+    crossings = np.nonzero(np.signbit(angle_diff[1:]) != np.signbit(angle_diff[:-1]))
+    if len(crossings[0]) != 0:
+        i = int(crossings[0][0])
+        weight = angle_diff[i] / (angle_diff[i] - angle_diff[i + 1])
+    else:
+        # curves only touch (no undercut), start from the closest approach
+        i = min(int(np.argmin(np.abs(angle_diff))), samples - 2)
+        weight = 0
+
+    trochoid_guess = trochoid_params[i] + weight * (
+        trochoid_params[i + 1] - trochoid_params[i]
+    )
+    involute_guess = involute_params[i] + weight * (
+        involute_params[i + 1] - involute_params[i]
+    )
+    # the involute tangent vanishes on the base circle
+    if involute_guess == 0:
+        involute_guess = involute_params[1] / 2
+
+    return np.array([trochoid_guess, involute_guess])
+
+
+def newton_intersection(guess, args, tolerance, max_iterations=30):
+    params = guess
+    for _ in range(max_iterations):
+        residual = intersection_residual(params, *args)
+        if abs(residual).max() < tolerance:
+            return params
+
+        (a, b), (c, d) = intersection_jacobian(params, *args)
+        det = a * d - b * c
+        if det == 0:
+            return None
+
+        params = params - np.array(
+            [
+                (d * residual[0] - b * residual[1]) / det,
+                (a * residual[1] - c * residual[0]) / det,
+            ]
+        )
+
+    return None
+
+
+def intersection(
+    trochoid_beta,
+    trochoid_distance,
+    dedendum_radius,
+    pitch_radius,
+    involute_beta,
+    base_radius,
+    addendum_radius,
+):
+    args = (
+        trochoid_beta,
+        trochoid_distance,
+        dedendum_radius,
+        pitch_radius,
+        involute_beta,
+        base_radius,
+    )
+
+    guess = intersection_guess(*args, addendum_radius)
+
+    tolerance = 1e-10 * pitch_radius
+    params = newton_intersection(guess, args, tolerance)
+    if params is not None and 0 <= params[0] <= 2 and 0 <= params[1] <= 2:
+        return params
+
+    # scipy takes longer to import than a whole gear takes to build, only
+    # load it for the rare cases newton can not solve
+    from scipy.optimize import least_squares
+
+    lower_bounds = [0, 0]
+    upper_bounds = [2, 2]
+    result = least_squares(
+        intersection_residual,
+        np.clip(guess, lower_bounds, upper_bounds),
+        jac=intersection_jacobian,
+        bounds=(lower_bounds, upper_bounds),
+        args=args,
+    )
+
+    if not result.success:
+        print("optimizer fail")
+
+    return result.x
+
+
+# involute parameter where the flank crosses the tooth center line
+def involute_clip(involute_beta, guess, tolerance=1e-12, max_iterations=30):
+    param = guess
+    for _ in range(max_iterations):
+        theta = involute_beta + param
+        value = param * math.cos(theta) - math.sin(theta)
+        if abs(value) < tolerance:
+            return param
+
+        slope = -param * math.sin(theta)
+        if slope == 0:
+            break
+
+        param -= value / slope
+
+    from scipy.optimize import fsolve
+
+    def func(theta):
+        return (theta - involute_beta) * np.cos(theta) - np.sin(theta)
+
+    theta_guess = involute_beta + guess
+    theta_solution = fsolve(func, theta_guess)[0]
+
+    return theta_solution - involute_beta
+
+
+def tooth_geometry(
+    teeth,
+    module,
+    pressure_angle,
+    backlash_factor,
+    dedendum_factor,
+    addendum_factor,
+    profile_shift_factor,
+):
+    backlash = module * backlash_factor
+    profile_shift = module * profile_shift_factor
+    dedendum = module * dedendum_factor - profile_shift
+    addendum = module * addendum_factor + profile_shift
+
+    pitch_radius = module * teeth / 2
+    base_radius = pitch_radius * math.cos(pressure_angle)
+    dedendum_radius = pitch_radius - dedendum
+    addendum_radius = pitch_radius + addendum
+
+    tan_pressure = math.tan(pressure_angle)
+
+    delta_arc = 2 * profile_shift * tan_pressure - backlash
+    delta_angle = delta_arc / pitch_radius / 2
+
+    involute_beta = pressure_angle - tan_pressure - (math.pi / 2) / teeth - delta_angle
+    trochoid_beta = (math.pi / 2) - (math.pi / 2) / teeth - delta_angle
+
+    trochoid_distance = dedendum * tan_pressure
+
+    trochoid_end, involute_start = intersection(
+        trochoid_beta,
+        trochoid_distance,
+        dedendum_radius,
+        pitch_radius,
+        involute_beta,
+        base_radius,
+        addendum_radius,
+    )
+
+    trochoid_start = trochoid_distance / pitch_radius
+
+    involute_end = math.sqrt((addendum_radius / (base_radius)) ** 2 - 1)
+
+    _, involute_end_y = involute_point(involute_end, involute_beta, base_radius)
+
+    keep_outer_arc = involute_end_y > 0
+    if involute_end_y < 0:
+        print("Involute clip before adendum")
+
+        involute_end = involute_clip(involute_beta, involute_end)
+
+    return {
+        "teeth": teeth,
+        "pitch_radius": pitch_radius,
+        "base_radius": base_radius,
+        "dedendum_radius": dedendum_radius,
+        "addendum_radius": addendum_radius,
+        "trochoid_beta": trochoid_beta,
+        "trochoid_distance": trochoid_distance,
+        "trochoid_start": trochoid_start,
+        "trochoid_end": trochoid_end,
+        "involute_beta": involute_beta,
+        "involute_start": involute_start,
+        "involute_end": involute_end,
+        "keep_outer_arc": keep_outer_arc,
+    }
+
+
+def trochoid_args(geometry):
+    return (
+        geometry["trochoid_beta"],
+        geometry["trochoid_distance"],
+        geometry["dedendum_radius"],
+        geometry["pitch_radius"],
+    )
+
+
+def involute_args(geometry):
+    return (geometry["involute_beta"], geometry["base_radius"])
+
+
+# the involute params leave out involute_start, where the trochoid ends.
+# Adaptive ignores points_per_tooth and places as few samples as keep each
+# flank within sampling_tolerance
+def flank_params(geometry, points_per_tooth, sampling_mode, sampling_tolerance):
+    if sampling_mode == "Adaptive":
+        trochoid = trochoid_args(geometry)
+        involute = involute_args(geometry)
+
+        trochoid_params = adaptive_params(
+            lambda params: trochoid_points(params, *trochoid),
+            lambda params: trochoid_derivatives(params, *trochoid),
+            geometry["trochoid_start"],
+            geometry["trochoid_end"],
+            sampling_tolerance,
+        )
+        involute_params = adaptive_params(
+            lambda params: involute_points(params, *involute),
+            lambda params: involute_derivatives(params, *involute),
+            geometry["involute_start"],
+            geometry["involute_end"],
+            sampling_tolerance,
+        )[1:]
+
+        return trochoid_params, involute_params
+
+    trochoid_step = (
+        geometry["trochoid_end"] - geometry["trochoid_start"]
+    ) / points_per_tooth
+    trochoid_params = (
+        geometry["trochoid_start"] + np.arange(points_per_tooth + 1) * trochoid_step
+    )
+
+    involute_step = (
+        geometry["involute_end"] - geometry["involute_start"]
+    ) / points_per_tooth
+    involute_params = (
+        geometry["involute_start"] + np.arange(1, points_per_tooth + 1) * involute_step
+    )
+
+    return trochoid_params, involute_params
+
+
+def flank_points(
+    geometry, points_per_tooth, sampling_mode="Uniform", sampling_tolerance=0
+):
+    trochoid_params, involute_params = flank_params(
+        geometry, points_per_tooth, sampling_mode, sampling_tolerance
+    )
+
+    trochoid = trochoid_points(trochoid_params, *trochoid_args(geometry))
+    involute = involute_points(involute_params, *involute_args(geometry))
+
+    return trochoid, involute
+
+
+# unit tangents at the flank params, the involute ones from involute_start
+def flank_tangents(geometry, trochoid_params, involute_params):
+    involute_params = np.concatenate(([geometry["involute_start"]], involute_params))
+
+    trochoid = trochoid_args(geometry)
+    involute = involute_args(geometry)
+
+    return (
+        unit_tangents(
+            trochoid_derivatives(trochoid_params, *trochoid),
+            trochoid_points(trochoid_params, *trochoid),
+        ),
+        unit_tangents(
+            involute_derivatives(involute_params, *involute),
+            involute_points(involute_params, *involute),
+        ),
+    )
+
+
+# one tooth from the tip center line to the next tip center line,
+# the same path as tooth_segments and its mirror
+def tooth_samples(
+    geometry, points_per_tooth, sampling_mode="Uniform", sampling_tolerance=0
+):
+    trochoid, involute = flank_points(
+        geometry, points_per_tooth, sampling_mode, sampling_tolerance
+    )
+    arc_count = max(3, points_per_tooth // 4)
+
+    segments = []
+    if geometry["keep_outer_arc"]:
+        tip_angle = math.atan2(involute[-1, 1], involute[-1, 0])
+        segments.append(
+            arc_points(geometry["addendum_radius"], 0, tip_angle, arc_count)
+        )
+    segments.append(involute[::-1])
+    segments.append(trochoid[::-1])
+
+    root_angle = math.atan2(trochoid[0, 1], trochoid[0, 0])
+    half_ang = math.pi / geometry["teeth"]
+    segments.append(
+        arc_points(geometry["dedendum_radius"], root_angle, half_ang, arc_count)
+    )
+
+    half = np.concatenate(segments)
+
+    # mirror about the gap center line
+    angle = 2 * half_ang
+    cos_angle = math.cos(angle)
+    sin_angle = math.sin(angle)
+    mirrored = np.column_stack(
+        (
+            half[:, 0] * cos_angle + half[:, 1] * sin_angle,
+            half[:, 0] * sin_angle - half[:, 1] * cos_angle,
+        )
+    )[::-1]
+
+    points = np.concatenate((half, mirrored))
+
+    # drop the repeated points where segments meet
+    steps = np.hypot(*np.diff(points, axis=0).T)
+    keep = np.concatenate(([True], steps > 1e-9 * geometry["addendum_radius"]))
+    return points[keep]
+
+
+# the half tooth from the tip center line to the gap center line
+def tooth_segments(geometry, points_per_tooth, sampling_mode, sampling_tolerance):
+    trochoid_params, involute_params = flank_params(
+        geometry, points_per_tooth, sampling_mode, sampling_tolerance
+    )
+    trochoid = trochoid_points(trochoid_params, *trochoid_args(geometry))
+    involute = np.concatenate(
+        (trochoid[-1:], involute_points(involute_params, *involute_args(geometry)))
+    )
+
+    trochoid_tangents = involute_tangents = None
+    if sampling_mode == "Adaptive":
+        trochoid_tangents, involute_tangents = flank_tangents(
+            geometry, trochoid_params, involute_params
+        )
+
+    segments = [
+        reverse_segment(spline_segment(involute, involute_tangents)),
+        reverse_segment(spline_segment(trochoid, trochoid_tangents)),
+    ]
+
+    if geometry["keep_outer_arc"]:
+        start = np.array([geometry["addendum_radius"], 0])
+        segments.insert(
+            0, origin_arc_segment(start, involute[-1], geometry["addendum_radius"])
+        )
+
+    half_ang = math.pi / geometry["teeth"]
+    center_dedendum = geometry["dedendum_radius"] * np.array(
+        [math.cos(half_ang), math.sin(half_ang)]
+    )
+    segments.append(
+        origin_arc_segment(trochoid[0], center_dedendum, geometry["dedendum_radius"])
+    )
+
+    return segments
+
+
+# keywords match gear_shape, angles in degrees
+def gear_geometry(
+    teeth=12,
+    module=2,
+    pressure_angle=20,
+    backlash_factor=0,
+    dedendum_factor=1.25,
+    addendum_factor=1,
+    profile_shift_factor=0,
+):
+    return tooth_geometry(
+        int(teeth),
+        float(module),
+        math.radians(float(pressure_angle)),
+        float(backlash_factor),
+        float(dedendum_factor),
+        float(addendum_factor),
+        float(profile_shift_factor),
+    )
+
+
+# the half tooth from the tip center line to the gap center line, mirrored
+def gear_tooth(
+    points_per_tooth=40, sampling_mode="Uniform", sampling_tolerance=0.001, **gear
+):
+    geometry = gear_geometry(**gear)
+    half = tooth_segments(
+        geometry, int(points_per_tooth), sampling_mode, float(sampling_tolerance)
+    )
+    return ToothProfile.from_segments(half, geometry["teeth"], mirrored=True)
+
+
+# one whole tooth from tip center line to tip center line
+def gear_segments(**gear):
+    return gear_tooth(**gear).whole().segments()
+
+
+# the closed outline of the whole gear, the last point joins the first
+def gear_polyline(
+    points_per_tooth=40, sampling_mode="Uniform", sampling_tolerance=0.001, **gear
+):
+    geometry = gear_geometry(**gear)
+    samples = tooth_samples(
+        geometry, int(points_per_tooth), sampling_mode, float(sampling_tolerance)
+    )
+    return pattern_points(samples, geometry["teeth"])
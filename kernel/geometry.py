@@ -0,0 +1,151 @@
+import math
+
+import numpy as np
+
+# profiles are described by segments, dicts of a kind and (x, y) point rows
+# running in the direction of the outline
+#   arc     start, a point on the arc and end
+#   spline  the points to interpolate and optionally unit tangents at them
+
+
+def arc_segment(start, middle, end):
+    return {"kind": "arc", "points": np.array([start, middle, end])}
+
+
+# an arc around the origin, through the middle of start and end
+def origin_arc_segment(start, end, radius):
+    middle = (start + end) / 2
+    return arc_segment(start, middle * (radius / math.hypot(*middle)), end)
+
+
+def spline_segment(points, tangents=None):
+    return {"kind": "spline", "points": points, "tangents": tangents}
+
+
+def rotate_points(points, angle):
+    cos_angle = math.cos(angle)
+    sin_angle = math.sin(angle)
+    return np.column_stack(
+        (
+            points[:, 0] * cos_angle - points[:, 1] * sin_angle,
+            points[:, 0] * sin_angle + points[:, 1] * cos_angle,
+        )
+    )
+
+
+# the segment run backwards
+def reverse_segment(segment):
+    copy = dict(segment)
+    copy["points"] = segment["points"][::-1]
+    if segment.get("tangents") is not None:
+        copy["tangents"] = -segment["tangents"][::-1]
+    return copy
+
+
+# the other half of a tooth, mirrored about the x axis and turned one tooth
+# on, reversed so the segments carry on from the end of the half they mirror
+def mirror_segments(segments, teeth):
+    angle = 2 * math.pi / teeth
+
+    mirrored = []
+    for segment in reversed(segments):
+        copy = reverse_segment(segment)
+        for key in ("points", "tangents"):
+            if copy.get(key) is not None:
+                copy[key] = rotate_points(copy[key] * [1, -1], angle)
+        mirrored.append(copy)
+
+    return mirrored
+
+
+def arc_points(radius, start_angle, end_angle, count):
+    angles = np.linspace(start_angle, end_angle, count)
+    return np.column_stack((radius * np.cos(angles), radius * np.sin(angles)))
+
+
+# count points along the arc through three points
+def three_point_arc(points, count):
+    (x1, y1), (x2, y2), (x3, y3) = points
+    d = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
+    s1 = x1 * x1 + y1 * y1
+    s2 = x2 * x2 + y2 * y2
+    s3 = x3 * x3 + y3 * y3
+    cx = (s1 * (y2 - y3) + s2 * (y3 - y1) + s3 * (y1 - y2)) / d
+    cy = (s1 * (x3 - x2) + s2 * (x1 - x3) + s3 * (x2 - x1)) / d
+
+    start, middle, end = np.arctan2(points[:, 1] - cy, points[:, 0] - cx)
+    sweep = (end - start) % (2 * math.pi)
+    # clockwise when the middle point is not on the counter clockwise sweep
+    if (middle - start) % (2 * math.pi) > sweep:
+        sweep -= 2 * math.pi
+
+    angles = np.linspace(start, start + sweep, count)
+    radius = math.hypot(x1 - cx, y1 - cy)
+    return np.column_stack((cx + radius * np.cos(angles), cy + radius * np.sin(angles)))
+
+
+# a polyline along the segments, splines by their points and arcs by
+# arc_count points, leaving out the points repeated where segments meet
+def segments_polyline(segments, arc_count=16):
+    parts = []
+    for segment in segments:
+        if segment["kind"] == "arc":
+            parts.append(three_point_arc(segment["points"], arc_count))
+        else:
+            parts.append(segment["points"])
+
+    points = np.concatenate(parts)
+    steps = np.hypot(*np.diff(points, axis=0).T)
+    keep = np.concatenate(([True], steps > 1e-9 * np.abs(points).max()))
+    return points[keep]
+
+
+# every tooth of the gear, or count teeth from tooth first on, leaving out
+# the repeated closing point
+def pattern_points(points, teeth, count=None, first=0):
+    if count is None:
+        count = teeth
+
+    angles = (first + np.arange(count)) * (2 * math.pi / teeth)
+    cos_angles = np.cos(angles)[:, np.newaxis]
+    sin_angles = np.sin(angles)[:, np.newaxis]
+
+    x = points[:-1, 0] * cos_angles - points[:-1, 1] * sin_angles
+    y = points[:-1, 0] * sin_angles + points[:-1, 1] * cos_angles
+
+    return np.column_stack((x.ravel(), y.ravel()))
+
+
+# the whole teeth between start_angle and end_angle in degrees, as the index
+# of the first and the count, tooth t spans t to t + 1 pitches on from
+# offset. a sector of a full turn or more is every tooth
+def sector_teeth(teeth, start_angle=0, end_angle=360, offset=0):
+    if end_angle - start_angle >= 360:
+        return 0, teeth
+
+    pitch = 360 / teeth
+    first = math.ceil((start_angle - offset) / pitch - 1e-9)
+    last = math.floor((end_angle - offset) / pitch + 1e-9)
+    if last <= first:
+        raise ValueError(
+            "no whole tooth between {} and {} degrees".format(start_angle, end_angle)
+        )
+    return first, last - first
+
+
+# the closed polyline of count teeth from tooth first on, closed through an
+# arc of radius (or the center) when they are not every tooth. points is one
+# whole tooth running counter clockwise, the last point joins the first
+def sector_polyline(points, teeth, first, count, radius=0, arc_count=8):
+    outline = pattern_points(points, teeth, count, first)
+    if count == teeth:
+        return outline
+
+    angle = 2 * math.pi / teeth
+    end = rotate_points(points[-1:], (first + count - 1) * angle)
+    if radius == 0:
+        return np.concatenate((outline, end, [[0, 0]]))
+
+    start_angle = math.atan2(outline[0, 1], outline[0, 0])
+    arc = arc_points(radius, start_angle + count * angle, start_angle, arc_count)
+    return np.concatenate((outline, end, arc))
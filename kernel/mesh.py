@@ -0,0 +1,351 @@
+import math
+import zipfile
+
+import numpy as np
+
+try:
+    from macro.kernel.geometry import pattern_points
+    from macro.kernel.gear import tooth_samples
+    from macro.kernel.meshing import mesh_geometry
+    from macro.kernel.sprocket import sprocket_arcs, sprocket_polyline
+    from macro.kernel.cycloid import cycloid_polyline, cycloid_tooth
+except ModuleNotFoundError:
+    from kernel.geometry import pattern_points
+    from kernel.gear import tooth_samples
+    from kernel.meshing import mesh_geometry
+    from kernel.sprocket import sprocket_arcs, sprocket_polyline
+    from kernel.cycloid import cycloid_polyline, cycloid_tooth
+
+
+def keywords(function, values):
+    names = function.__code__.co_varnames[: function.__code__.co_argcount]
+    return {key: value for key, value in values.items() if key in names}
+
+
+def cross(a, b):
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+# ear clipping of a simple counter clockwise polygon, returns counter
+# clockwise index triples
+def triangulate(polygon):
+    count = len(polygon)
+    previous = np.roll(np.arange(count), 1)
+    following = np.roll(np.arange(count), -1)
+    alive = np.ones(count, dtype=bool)
+
+    def corner(i):
+        a, c = previous[i], following[i]
+        return cross(polygon[i] - polygon[a], polygon[c] - polygon[i])
+
+    reflex = np.array([corner(i) < 0 for i in range(count)])
+
+    def is_ear(i):
+        a, c = previous[i], following[i]
+        if corner(i) <= 0:
+            return False
+        others = np.flatnonzero(reflex & alive)
+        others = others[(others != a) & (others != c)]
+        if len(others) == 0:
+            return True
+        points = polygon[others]
+        return not np.any(
+            (cross(polygon[i] - polygon[a], points - polygon[a]) >= 0)
+            & (cross(polygon[c] - polygon[i], points - polygon[i]) >= 0)
+            & (cross(polygon[a] - polygon[c], points - polygon[c]) >= 0)
+        )
+
+    triangles = []
+    remaining = count
+    i = 0
+    misses = 0
+    while remaining > 3:
+        # a degenerate polygon has no ear left, clip anyway to finish
+        if is_ear(i) or misses > remaining:
+            a, c = previous[i], following[i]
+            triangles.append((a, i, c))
+            following[a] = c
+            previous[c] = a
+            alive[i] = False
+            remaining -= 1
+            misses = 0
+            for j in (a, c):
+                reflex[j] = corner(j) < 0
+            i = c
+        else:
+            misses += 1
+            i = following[i]
+
+    i = np.flatnonzero(alive)[0]
+    triangles.append((previous[i], i, following[i]))
+    return np.array(triangles, dtype=np.int64)
+
+
+# z levels and turn angles along the height, a helix turns by rate radians
+# per unit of height, enough levels that the straight side between two keeps
+# radius within tolerance of the helix
+def helix_levels(bottom, height, rate=0, double_helix=False, radius=1, tolerance=0.01):
+    middle = bottom + height / 2
+    if rate == 0:
+        return np.array([bottom, bottom + height]), np.zeros(2)
+
+    step = 2 * math.acos(max(1 - tolerance / radius, -1))
+    count = max(1, int(math.ceil(abs(rate) * height / 2 / step)))
+    levels = np.linspace(bottom, bottom + height, 2 * count + 1)
+    if double_helix:
+        return levels, rate * np.abs(levels - middle)
+    return levels, rate * (levels - middle)
+
+
+# a closed triangle mesh of the outline swept through the levels, turned by
+# angles at each, with a bore (or for internal gears an outer circle) of
+# radius. the outline runs counter clockwise with teeth equal periods, as
+# pattern_points leaves them. returns float vertices and int triangles, the
+# triangles wind counter clockwise seen from outside
+def prism_mesh(
+    outline, teeth, levels, angles, radius=0, internal=False, circle_points=64
+):
+    outline = np.asarray(outline, dtype=float)
+    if cross(outline, np.roll(outline, -1, axis=0)).sum() < 0:
+        outline = np.roll(outline[::-1], 1, axis=0)
+    count = len(outline)
+    period = count // teeth
+    start_angle = math.atan2(outline[0, 1], outline[0, 0])
+
+    per_tooth = max(1, int(math.ceil(circle_points / teeth))) if radius else 0
+    circle_count = per_tooth * teeth
+    circle_angles = start_angle + np.arange(circle_count) * (
+        2 * math.pi / max(circle_count, 1)
+    )
+    circle = radius * np.column_stack((np.cos(circle_angles), np.sin(circle_angles)))
+
+    ring = np.concatenate((outline, circle))
+    ring_count = len(ring)
+    level_count = len(levels)
+
+    levels = np.asarray(levels, dtype=float)
+    cos_angles = np.cos(angles)[:, np.newaxis]
+    sin_angles = np.sin(angles)[:, np.newaxis]
+    x = ring[:, 0] * cos_angles - ring[:, 1] * sin_angles
+    y = ring[:, 0] * sin_angles + ring[:, 1] * cos_angles
+    z = np.broadcast_to(levels[:, np.newaxis], x.shape)
+    vertices = np.stack((x, y, z), axis=-1).reshape(-1, 3)
+
+    # one sector of the cap, from the outline of a tooth to the circle or
+    # the center, triangulated once and turned to every tooth
+    outline_local = np.arange(period + 1)
+    circle_local = np.arange(per_tooth + 1)
+    if radius == 0:
+        centers = len(vertices) + np.arange(2)
+        vertices = np.concatenate((vertices, [[0, 0, levels[0]], [0, 0, levels[-1]]]))
+        polygon = np.concatenate((outline[outline_local], [[0, 0]]))
+    elif internal:
+        polygon = np.concatenate((circle[circle_local], outline[outline_local[::-1]]))
+    else:
+        polygon = np.concatenate((outline[outline_local], circle[circle_local[::-1]]))
+    sector = triangulate(polygon)
+
+    shifts = np.arange(teeth)[:, np.newaxis]
+    outline_map = (outline_local + shifts * period) % count
+    if radius == 0:
+        cap_map = np.column_stack((outline_map, np.full(teeth, -1)))
+    else:
+        circle_map = count + (circle_local + shifts * per_tooth) % circle_count
+        if internal:
+            cap_map = np.column_stack((circle_map, outline_map[:, ::-1]))
+        else:
+            cap_map = np.column_stack((outline_map, circle_map[:, ::-1]))
+    cap = cap_map[:, sector].reshape(-1, 3)
+
+    top_offset = (level_count - 1) * ring_count
+    if radius == 0:
+        bottom = np.where(cap < 0, centers[0], cap)
+        top = np.where(cap < 0, centers[1], cap + top_offset)
+    else:
+        bottom = cap
+        top = cap + top_offset
+
+    walls = []
+    loops = [(np.arange(count), not internal)]
+    if radius:
+        loops.append((count + np.arange(circle_count), internal))
+    layers = np.arange(level_count - 1)[:, np.newaxis] * ring_count
+    for loop, outward in loops:
+        lower = loop + layers
+        lower_next = np.roll(loop, -1) + layers
+        upper = lower + ring_count
+        upper_next = lower_next + ring_count
+        quads = np.stack(
+            (lower, lower_next, upper_next, lower, upper_next, upper), axis=-1
+        ).reshape(-1, 3)
+        walls.append(quads if outward else quads[:, ::-1])
+
+    return vertices, np.concatenate([bottom[:, ::-1], top] + walls)
+
+
+def write_stl(path, vertices, triangles):
+    corners = vertices[triangles]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)[:, np.newaxis]
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+    data = np.zeros(
+        len(triangles),
+        dtype=[
+            ("normal", "<f4", (3,)),
+            ("corners", "<f4", (3, 3)),
+            ("attribute", "<u2"),
+        ],
+    )
+    data["normal"] = normals
+    data["corners"] = corners
+
+    with open(path, "wb") as file:
+        file.write(b"binary stl".ljust(80, b" "))
+        file.write(np.uint32(len(triangles)).tobytes())
+        file.write(data.tobytes())
+
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>
+</Types>
+"""
+
+RELATIONSHIPS = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Target="/3D/3dmodel.model" Id="rel0" Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>
+</Relationships>
+"""
+
+MODEL = """<?xml version="1.0" encoding="UTF-8"?>
+<model unit="millimeter" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">
+<resources>
+<object id="1" type="model">
+<mesh>
+<vertices>
+{}</vertices>
+<triangles>
+{}</triangles>
+</mesh>
+</object>
+</resources>
+<build>
+<item objectid="1"/>
+</build>
+</model>
+"""
+
+
+def write_3mf(path, vertices, triangles):
+    vertex_text = ('<vertex x="%.6f" y="%.6f" z="%.6f"/>\n' * len(vertices)) % tuple(
+        vertices.ravel().tolist()
+    )
+    triangle_text = ('<triangle v1="%d" v2="%d" v3="%d"/>\n' * len(triangles)) % tuple(
+        triangles.ravel().tolist()
+    )
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        archive.writestr("_rels/.rels", RELATIONSHIPS)
+        archive.writestr("3D/3dmodel.model", MODEL.format(vertex_text, triangle_text))
+
+
+MESH_FORMATS = {"stl": write_stl, "3mf": write_3mf}
+
+
+def write_mesh(path, vertices, triangles, format):
+    MESH_FORMATS[format](path, vertices, triangles)
+
+
+# meshes cover the whole part, a sector or bolt holes would need a boolean
+# cut, so they are refused rather than left out of the mesh
+def check_whole(values):
+    if float(values.get("end_angle", 360)) - float(values.get("start_angle", 0)) < 360:
+        raise ValueError("meshes cover whole parts, not sectors")
+    bolts = [
+        float(values.get(name, 0))
+        for name in ("bolt_circle_diameter", "bolt_diameter", "bolt_count")
+    ]
+    if all(value > 0 for value in bolts):
+        raise ValueError("meshes have no bolt holes")
+
+
+# meshes of the generators, keywords are the same as for the shape
+# functions, the mesh keywords set how finely helices and circles are split
+def gear_mesh(
+    teeth=12,
+    module=2,
+    height=6,
+    helix_angle=0,
+    double_helix=True,
+    reverse_helix=False,
+    second_radius=0,
+    points_per_tooth=40,
+    sampling_mode="Uniform",
+    sampling_tolerance=0.001,
+    helix_tolerance=0.01,
+    circle_points=64,
+    teeth_override=0,
+    **gear
+):
+    if int(teeth_override) != 0:
+        raise ValueError("meshes cover whole gears, not a TeethOverride")
+    check_whole(gear)
+    teeth = int(teeth)
+    height = float(height)
+    second_radius = float(second_radius)
+
+    geometry, internal = mesh_geometry(
+        dict(gear, teeth=teeth, module=module, second_radius=second_radius)
+    )
+    samples = tooth_samples(
+        geometry, int(points_per_tooth), str(sampling_mode), float(sampling_tolerance)
+    )
+    outline = pattern_points(samples, teeth)
+
+    rate = math.tan(math.radians(float(helix_angle))) / geometry["pitch_radius"]
+    if reverse_helix:
+        rate = -rate
+    levels, angles = helix_levels(
+        -height / 2,
+        height,
+        rate,
+        bool(double_helix),
+        max(geometry["addendum_radius"], second_radius),
+        float(helix_tolerance),
+    )
+
+    return prism_mesh(
+        outline, teeth, levels, angles, second_radius, internal, int(circle_points)
+    )
+
+
+# one strand, the hub of more strands needs a boolean union
+def sprocket_mesh(
+    teeth=12, height=3, strands=1, hub_length=0, points_per_arc=16, **sprocket
+):
+    if int(strands) != 1 or float(hub_length) != 0:
+        raise ValueError("meshes cover single strand sprockets without a hub")
+    check_whole(sprocket)
+    outline = sprocket_polyline(
+        teeth, points_per_arc, **keywords(sprocket_arcs, sprocket)
+    )
+    levels, angles = helix_levels(0, float(height))
+    return prism_mesh(outline, int(teeth), levels, angles)
+
+
+def cycloid_mesh(teeth=23, height=4, **cycloid):
+    check_whole(cycloid)
+    outline = cycloid_polyline(teeth, **keywords(cycloid_tooth, cycloid))
+    height = float(height)
+    levels, angles = helix_levels(-height / 2, height)
+    return prism_mesh(outline, int(teeth), levels, angles)
+
+
+MESHES = {
+    "gear": gear_mesh,
+    "sprocket": sprocket_mesh,
+    "cycloid": cycloid_mesh,
+}
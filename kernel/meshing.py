@@ -0,0 +1,262 @@
+import math
+
+import numpy as np
+
+try:
+    from macro.kernel.gear import gear_geometry, tooth_samples
+except ModuleNotFoundError:
+    from kernel.gear import gear_geometry, tooth_samples
+
+GEAR_KEYWORDS = gear_geometry.__code__.co_varnames[: gear_geometry.__code__.co_argcount]
+
+
+# the profile gear_shape cuts for a parameter set, an internal gear is the
+# outline of an external one with addendum and dedendum swapped
+def mesh_geometry(gear):
+    gear = dict(gear)
+    second_radius = float(gear.pop("second_radius", 0))
+    gear = {key: value for key, value in gear.items() if key in GEAR_KEYWORDS}
+
+    geometry = gear_geometry(**gear)
+    internal = second_radius > geometry["pitch_radius"]
+    if internal:
+        gear["addendum_factor"], gear["dedendum_factor"] = (
+            gear.get("dedendum_factor", 1.25),
+            gear.get("addendum_factor", 1),
+        )
+        gear["backlash_factor"] = -gear.get("backlash_factor", 0)
+        geometry = gear_geometry(**gear)
+
+    return geometry, internal
+
+
+def involute_radius(geometry, param):
+    return geometry["base_radius"] * math.sqrt(1 + param**2)
+
+
+def involute_function(angle):
+    return math.tan(angle) - angle
+
+
+def inverse_involute(value, tolerance=1e-14, max_iterations=30):
+    angle = (3 * value) ** (1 / 3)
+    for _ in range(max_iterations):
+        step = (involute_function(angle) - value) / math.tan(angle) ** 2
+        angle -= step
+        if abs(step) < tolerance:
+            break
+    return angle
+
+
+# the center distance where the flanks touch on both sides, leaving out the
+# backlash allowance, from the profile shifts of the pair
+def center_distance(gear, other):
+    geometry, _ = mesh_geometry(gear)
+    other_geometry, internal = mesh_geometry(other)
+
+    teeth = geometry["teeth"]
+    other_teeth = other_geometry["teeth"]
+    pressure_angle = math.radians(float(gear.get("pressure_angle", 20)))
+    shift = float(gear.get("profile_shift_factor", 0))
+    other_shift = float(other.get("profile_shift_factor", 0))
+
+    # the space of an internal gear widens with its shift like a tooth does
+    if internal:
+        shift_sum = (other_shift - shift) / (other_teeth - teeth)
+        radius_sum = other_geometry["pitch_radius"] - geometry["pitch_radius"]
+    else:
+        shift_sum = (shift + other_shift) / (teeth + other_teeth)
+        radius_sum = other_geometry["pitch_radius"] + geometry["pitch_radius"]
+
+    working_angle = inverse_involute(
+        involute_function(pressure_angle) + 2 * math.tan(pressure_angle) * shift_sum
+    )
+    return radius_sum * math.cos(pressure_angle) / math.cos(working_angle)
+
+
+# the polar outline of one flank, the half tooth angle for each radius
+def flank_table(geometry, points_per_tooth):
+    samples = tooth_samples(geometry, points_per_tooth)
+    angles = np.arctan2(samples[:, 1], samples[:, 0])
+    half = samples[angles <= math.pi / geometry["teeth"] + 1e-12]
+
+    radii = np.hypot(half[:, 0], half[:, 1])[::-1]
+    angles = np.arctan2(half[:, 1], half[:, 0])[::-1]
+    return np.maximum.accumulate(radii), angles
+
+
+# the points along the line of action, measured from where it touches the
+# base circle of the first gear, and the radius each sits at on both gears
+def contact_path(geometry, other_geometry, internal, distance):
+    base_radius = geometry["base_radius"]
+    other_base_radius = other_geometry["base_radius"]
+
+    if internal:
+        cos_angle = (other_base_radius - base_radius) / distance
+    else:
+        cos_angle = (other_base_radius + base_radius) / distance
+    if not 0 < cos_angle < 1:
+        raise ValueError("center distance {} does not mesh the pair".format(distance))
+
+    working_angle = math.acos(cos_angle)
+    length = distance * math.sin(working_angle)
+
+    tip_radius = involute_radius(geometry, geometry["involute_end"])
+    form_radius = involute_radius(geometry, geometry["involute_start"])
+    end = math.sqrt(tip_radius**2 - base_radius**2)
+
+    if internal:
+        # the tips of an internal gear point inwards, where the outline of
+        # the swapped profile starts its involute
+        other_tip = involute_radius(other_geometry, other_geometry["involute_start"])
+        other_form = involute_radius(other_geometry, other_geometry["involute_end"])
+        start = math.sqrt(other_tip**2 - other_base_radius**2) - length
+        other_contact = math.hypot(other_base_radius, end + length)
+        other_interference = other_contact > other_form * (1 + 1e-9)
+    else:
+        other_tip = involute_radius(other_geometry, other_geometry["involute_end"])
+        other_form = involute_radius(other_geometry, other_geometry["involute_start"])
+        start = length - math.sqrt(other_tip**2 - other_base_radius**2)
+        other_contact = math.hypot(other_base_radius, length - end)
+        other_interference = end > length or other_contact < other_form * (1 - 1e-9)
+        end = min(end, length)
+
+    contact = math.hypot(base_radius, start)
+    interference = start < 0 or contact < form_radius * (1 - 1e-9)
+    start = max(start, 0)
+
+    return {
+        "working_angle": working_angle,
+        "start": start,
+        "end": end,
+        "interference": (interference, other_interference),
+    }
+
+
+# the radial gap between the tips of each gear and the root circle of the
+# other, where they pass on the line of centers
+def root_clearance(geometry, other_geometry, internal, distance):
+    tip_radius = geometry["addendum_radius"]
+    root_radius = geometry["dedendum_radius"]
+    if internal:
+        return (
+            other_geometry["addendum_radius"] - distance - tip_radius,
+            other_geometry["dedendum_radius"] - distance - root_radius,
+        )
+    return (
+        distance - tip_radius - other_geometry["dedendum_radius"],
+        distance - other_geometry["addendum_radius"] - root_radius,
+    )
+
+
+# the play of the second gear against the first held still, for every
+# rotation step through one tooth of the first, in radians of the second,
+# every tooth is the same so one tooth covers the whole rotation
+def rotation_play(
+    geometry, other_geometry, internal, distance, points_per_tooth, rotation_steps
+):
+    teeth = geometry["teeth"]
+    other_teeth = other_geometry["teeth"]
+    pitch_angle = 2 * math.pi / teeth
+    other_pitch_angle = 2 * math.pi / other_teeth
+    other_root = other_geometry["dedendum_radius"]
+    other_tip = other_geometry["addendum_radius"]
+
+    # only the teeth of the first gear that reach into the other one
+    sign = -1 if internal else 1
+    window = 0
+    for radius in (geometry["dedendum_radius"], geometry["addendum_radius"]):
+        if internal:
+            cosine = (other_root**2 - radius**2 - distance**2) / (2 * distance * radius)
+        else:
+            cosine = (radius**2 + distance**2 - other_tip**2) / (2 * distance * radius)
+        window = max(window, math.acos(min(max(cosine, -1), 1)))
+    reach = min(int(math.ceil(window / pitch_angle)) + 1, teeth // 2)
+
+    tooth = tooth_samples(geometry, points_per_tooth)[:-1]
+    offsets = np.arange(-reach, reach) * pitch_angle
+    angles = np.arctan2(tooth[:, 1], tooth[:, 0]) + offsets[:, np.newaxis]
+    radii = np.broadcast_to(np.hypot(tooth[:, 0], tooth[:, 1]), angles.shape)
+
+    rotations = np.arange(rotation_steps) * (pitch_angle / rotation_steps)
+    angles = angles.ravel() + rotations[:, np.newaxis]
+    radii = radii.ravel()
+
+    x = radii * np.cos(angles) - sign * distance
+    y = radii * np.sin(angles)
+    other_radii = np.hypot(x, y)
+
+    # the other gear turns the other way, with a gap facing the first
+    if internal:
+        other_rotations = rotations * (teeth / other_teeth)
+    else:
+        other_rotations = (
+            math.pi - other_pitch_angle / 2 - rotations * (teeth / other_teeth)
+        )
+    other_angles = np.arctan2(y, x) - other_rotations[:, np.newaxis]
+
+    table_radii, table_angles = flank_table(other_geometry, points_per_tooth)
+    half_angles = np.interp(other_radii, table_radii, table_angles)
+
+    inside = (other_radii > other_root) & (other_radii < other_tip)
+    if internal:
+        # the outline teeth are the spaces of an internal gear
+        offset = np.mod(other_angles + other_pitch_angle / 2, other_pitch_angle)
+        offset -= other_pitch_angle / 2
+        forward = offset + half_angles
+        backward = half_angles - offset
+    else:
+        offset = np.mod(other_angles, other_pitch_angle)
+        forward = offset - half_angles
+        backward = other_pitch_angle - half_angles - offset
+
+    forward = np.where(inside, forward, np.inf).min(axis=1)
+    backward = np.where(inside, backward, np.inf).min(axis=1)
+    return forward + backward
+
+
+# contact ratio, interference, clearance and backlash of two gears, each a
+# dict of gear_shape keywords, the second one internal when its second
+# radius lies outside its pitch circle
+def mesh_analysis(gear, other, distance=None, points_per_tooth=100, rotation_steps=16):
+    geometry, internal = mesh_geometry(gear)
+    other_geometry, other_internal = mesh_geometry(other)
+    if internal:
+        raise ValueError("only the second gear of a pair can be internal")
+
+    base_pitch = 2 * math.pi * geometry["base_radius"] / geometry["teeth"]
+    other_base_pitch = (
+        2 * math.pi * other_geometry["base_radius"] / other_geometry["teeth"]
+    )
+    if not math.isclose(base_pitch, other_base_pitch, rel_tol=1e-9):
+        raise ValueError(
+            "base pitch {} and {} do not mesh".format(base_pitch, other_base_pitch)
+        )
+
+    if distance is None:
+        distance = center_distance(gear, other)
+    distance = float(distance)
+
+    path = contact_path(geometry, other_geometry, other_internal, distance)
+    clearance = root_clearance(geometry, other_geometry, other_internal, distance)
+    play = rotation_play(
+        geometry,
+        other_geometry,
+        other_internal,
+        distance,
+        int(points_per_tooth),
+        int(rotation_steps),
+    )
+    backlash = play * other_geometry["pitch_radius"]
+
+    return {
+        "center_distance": distance,
+        "working_pressure_angle": math.degrees(path["working_angle"]),
+        "contact_ratio": max(path["end"] - path["start"], 0) / base_pitch,
+        "tip_interference": path["interference"],
+        "root_interference": tuple(gap < 0 for gap in clearance),
+        "clearance": min(clearance),
+        "backlash": float(backlash.min()),
+        "max_backlash": float(backlash.max()),
+        "interference": any(path["interference"]) or min(clearance) < 0,
+    }
@@ -0,0 +1,35 @@
+try:
+    from macro.kernel.gear import gear_polyline, gear_segments
+    from macro.kernel.sprocket import sprocket_polyline, sprocket_segments
+    from macro.kernel.cycloid import cycloid_polyline, cycloid_segments
+    from macro.kernel.rack import rack_polyline
+except ModuleNotFoundError:
+    from kernel.gear import gear_polyline, gear_segments
+    from kernel.sprocket import sprocket_polyline, sprocket_segments
+    from kernel.cycloid import cycloid_polyline, cycloid_segments
+    from kernel.rack import rack_polyline
+
+POLYLINES = {
+    "gear": gear_polyline,
+    "sprocket": sprocket_polyline,
+    "cycloid": cycloid_polyline,
+    "rack": rack_polyline,
+}
+
+SEGMENTS = {
+    "gear": gear_segments,
+    "sprocket": sprocket_segments,
+    "cycloid": cycloid_segments,
+}
+
+
+# closed outlines for a batch of parameter sets, each a dict of the
+# generator keywords
+def polylines(kind, parameter_sets):
+    polyline = POLYLINES[kind]
+    return [polyline(**parameters) for parameters in parameter_sets]
+
+
+def segments(kind, parameter_sets):
+    tooth = SEGMENTS[kind]
+    return [tooth(**parameters) for parameters in parameter_sets]
@@ -0,0 +1,132 @@
+import math
+
+import numpy as np
+
+
+# the straight sided tooth of the rack a Gear with the same keywords mates
+# with, the tooth lines moved out by the profile shift and thinned by the
+# backlash like the gear teeth are. x runs along the rack, y up from the
+# pitch line, one pitch from the middle of a gap to the middle of the next
+def rack_geometry(
+    module,
+    pressure_angle,
+    backlash_factor,
+    dedendum_factor,
+    addendum_factor,
+    profile_shift_factor,
+):
+    profile_shift = module * profile_shift_factor
+    dedendum = module * dedendum_factor - profile_shift
+    addendum = module * addendum_factor + profile_shift
+
+    pitch = math.pi * module
+    tan_pressure = math.tan(pressure_angle)
+    thickness = pitch / 2 + 2 * profile_shift * tan_pressure - module * backlash_factor
+
+    # a pointed tooth ends where its flanks meet, a wide one where they
+    # meet the flanks of the next
+    addendum = min(addendum, thickness / 2 / tan_pressure)
+    dedendum = min(dedendum, (pitch - thickness) / 2 / tan_pressure)
+
+    return {
+        "pitch": pitch,
+        "addendum": addendum,
+        "dedendum": dedendum,
+        "tip_half_width": thickness / 2 - addendum * tan_pressure,
+        "root_half_width": thickness / 2 + dedendum * tan_pressure,
+    }
+
+
+# one tooth centered on x = 0, from the middle of the gap before it to the
+# middle of the gap after it
+def rack_tooth(geometry):
+    half_pitch = geometry["pitch"] / 2
+    tip = geometry["tip_half_width"]
+    root = geometry["root_half_width"]
+    top = geometry["addendum"]
+    bottom = -geometry["dedendum"]
+
+    points = np.array(
+        [
+            [-half_pitch, bottom],
+            [-root, bottom],
+            [-tip, top],
+            [tip, top],
+            [root, bottom],
+            [half_pitch, bottom],
+        ]
+    )
+
+    # drop the lands a pointed or wide tooth leaves with no length
+    steps = np.hypot(*np.diff(points, axis=0).T)
+    keep = np.concatenate(([True], steps > 1e-9 * geometry["pitch"]))
+    return points[keep]
+
+
+# teeth translated copies of the tooth starting at x = 0, leaving out the
+# repeated point where two meet
+def pattern_rack(tooth, teeth, pitch):
+    offsets = (np.arange(teeth) + 0.5) * pitch
+    x = tooth[:-1, 0] + offsets[:, np.newaxis]
+    y = np.broadcast_to(tooth[:-1, 1], x.shape)
+    return np.column_stack((x.ravel(), y.ravel()))
+
+
+# keywords match rack_shape, angles in degrees
+def rack_profile(
+    module=2,
+    pressure_angle=20,
+    backlash_factor=0,
+    dedendum_factor=1.25,
+    addendum_factor=1,
+    profile_shift_factor=0,
+):
+    return rack_geometry(
+        float(module),
+        math.radians(float(pressure_angle)),
+        float(backlash_factor),
+        float(dedendum_factor),
+        float(addendum_factor),
+        float(profile_shift_factor),
+    )
+
+
+# the closed outline of teeth teeth down to back_height below the root
+# line, counter clockwise, the last point joins the first
+def rack_outline(geometry, teeth, back_height):
+    pitch = geometry["pitch"]
+    bottom = -geometry["dedendum"] - back_height
+
+    teeth_points = pattern_rack(rack_tooth(geometry), teeth, pitch)
+    return np.concatenate(
+        (
+            [[0, bottom], [teeth * pitch, bottom]],
+            [[teeth * pitch, -geometry["dedendum"]]],
+            teeth_points[::-1],
+        )
+    )
+
+
+def rack_polyline(teeth=20, back_height=4, **rack):
+    return rack_outline(rack_profile(**rack), int(teeth), float(back_height))
+
+
+# the axial section of one worm thread, radius and axial position, the
+# rack tooth wrapped around pitch_radius and reaching overlap into the
+# root cylinder so the two fuse into one solid
+def thread_section(geometry, pitch_radius, overlap):
+    tip = geometry["tip_half_width"]
+    root = geometry["root_half_width"]
+    outer = pitch_radius + geometry["addendum"]
+    inner = pitch_radius - geometry["dedendum"]
+
+    return np.array(
+        [
+            [inner - overlap, -root],
+            [inner, -root],
+            [outer, -tip],
+            [outer, tip],
+            [inner, root],
+            [inner - overlap, root],
+        ]
+    )
@@ -0,0 +1,66 @@
+import numpy as np
+
+SAMPLING_MODES = ["Uniform", "Adaptive"]
+
+# where each interval is checked against the curve
+FRACTIONS = np.linspace(0, 1, 9)[1:-1, np.newaxis, np.newaxis]
+
+
+# slopes scaled to unit length. where the derivative vanishes, such as an
+# involute starting on its base circle, the chord between the
+# neighbouring points gives the direction instead. a curve of zero length,
+# such as the trochoid of a gear without dedendum, has no direction at all
+def unit_tangents(slopes, points):
+    lengths = np.hypot(*slopes.T)
+    flat = lengths <= 1e-12 * np.abs(points).max()
+    if flat.any():
+        slopes = np.where(flat[:, np.newaxis], np.gradient(points, axis=0), slopes)
+        lengths = np.hypot(*slopes.T)
+        if (lengths == 0).any():
+            raise ValueError("curve has no direction, its points repeat")
+    return slopes / lengths[:, np.newaxis]
+
+
+# curve parameters between start and end for a spline through points(params)
+# with unit_tangents(derivatives(params)) as its tangents, which is a chord
+# length cubic hermite per interval. intervals are halved until the hermite
+# stays within tolerance of the curve, so samples gather where the curvature
+# needs them. points and derivatives map a parameter array to (x, y) rows
+def adaptive_params(points, derivatives, start, end, tolerance, max_points=4096):
+    params = np.linspace(start, end, 5)
+
+    while len(params) < max_points:
+        values = points(params)
+        tangents = unit_tangents(derivatives(params), values)
+        chords = np.hypot(*np.diff(values, axis=0).T)[:, np.newaxis]
+
+        u = FRACTIONS
+        hermite = (
+            (2 * u**3 - 3 * u**2 + 1) * values[:-1]
+            + (u**3 - 2 * u**2 + u) * chords * tangents[:-1]
+            + (3 * u**2 - 2 * u**3) * values[1:]
+            + (u**3 - u**2) * chords * tangents[1:]
+        )
+
+        # project onto the curve with a few gauss newton steps
+        nearest = params[:-1] + np.diff(params) * u[:, :, 0]
+        for _ in range(3):
+            flat = nearest.ravel()
+            offsets = hermite.reshape(-1, 2) - points(flat)
+            slopes = derivatives(flat)
+            flat = flat + np.sum(offsets * slopes, axis=1) / np.sum(
+                slopes * slopes, axis=1
+            )
+            nearest = flat.reshape(nearest.shape)
+
+        offsets = hermite.reshape(-1, 2) - points(nearest.ravel())
+        errors = np.hypot(*offsets.T).reshape(nearest.shape).max(axis=0)
+
+        split = errors > tolerance
+        if not split.any():
+            break
+
+        middles = params[:-1] + np.diff(params) / 2
+        params = np.insert(params, np.flatnonzero(split) + 1, middles[split])
+
+    return params
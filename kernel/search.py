@@ -0,0 +1,321 @@
+import numpy as np
+
+try:
+    from macro.kernel.gear import intersection
+except ModuleNotFoundError:
+    from kernel.gear import intersection
+
+COLUMNS = [
+    "teeth",
+    "module",
+    "pressure_angle",
+    "backlash_factor",
+    "dedendum_factor",
+    "addendum_factor",
+    "profile_shift_factor",
+]
+
+INTERSECTION_ARGS = [
+    "trochoid_beta",
+    "trochoid_distance",
+    "dedendum_radius",
+    "pitch_radius",
+    "involute_beta",
+    "base_radius",
+    "addendum_radius",
+]
+
+
+# every combination of the given values, keywords match gear_geometry, each
+# a value or a sequence, as flat arrays
+def parameter_grid(**values):
+    names = list(values)
+    grids = np.meshgrid(
+        *[np.atleast_1d(np.asarray(values[name], dtype=float)) for name in names],
+        indexing="ij",
+    )
+    return {name: grid.ravel() for name, grid in zip(names, grids)}
+
+
+# tooth_geometry for arrays of parameters, without the intersection
+def geometry_arrays(
+    teeth,
+    module,
+    pressure_angle,
+    backlash_factor,
+    dedendum_factor,
+    addendum_factor,
+    profile_shift_factor,
+):
+    backlash = module * backlash_factor
+    profile_shift = module * profile_shift_factor
+    dedendum = module * dedendum_factor - profile_shift
+    addendum = module * addendum_factor + profile_shift
+
+    pitch_radius = module * teeth / 2
+    base_radius = pitch_radius * np.cos(pressure_angle)
+    tan_pressure = np.tan(pressure_angle)
+
+    delta_arc = 2 * profile_shift * tan_pressure - backlash
+    delta_angle = delta_arc / pitch_radius / 2
+
+    return {
+        "pitch_radius": pitch_radius,
+        "base_radius": base_radius,
+        "dedendum_radius": pitch_radius - dedendum,
+        "addendum_radius": pitch_radius + addendum,
+        "trochoid_beta": np.pi / 2 - (np.pi / 2) / teeth - delta_angle,
+        "trochoid_distance": dedendum * tan_pressure,
+        "involute_beta": pressure_angle
+        - tan_pressure
+        - (np.pi / 2) / teeth
+        - delta_angle,
+    }
+
+
+def trochoid_arrays(params, geometry):
+    theta = geometry["trochoid_beta"] - params
+    temp = geometry["pitch_radius"] * params - geometry["trochoid_distance"]
+    radius = geometry["dedendum_radius"]
+    return (
+        radius * np.sin(theta) + temp * np.cos(theta),
+        radius * np.cos(theta) - temp * np.sin(theta),
+    )
+
+
+def involute_arrays(params, geometry):
+    theta = geometry["involute_beta"] + params
+    temp = geometry["base_radius"] * params
+    radius = geometry["base_radius"]
+    return (
+        temp * np.sin(theta) + radius * np.cos(theta),
+        temp * np.cos(theta) - radius * np.sin(theta),
+    )
+
+
+# intersection_guess for every combination at once, samples along axis 0
+def intersection_guesses(geometry, samples=32):
+    base_radius = geometry["base_radius"]
+    dedendum_radius = geometry["dedendum_radius"]
+    low_radius = np.maximum(base_radius, dedendum_radius)
+    high_radius = np.maximum(geometry["addendum_radius"], low_radius)
+
+    involute_low = np.sqrt((low_radius / base_radius) ** 2 - 1)
+    involute_high = np.sqrt((high_radius / base_radius) ** 2 - 1)
+    involute_params = np.linspace(involute_low, involute_high, samples)
+
+    radii_squared = base_radius**2 * (1 + involute_params**2)
+    temp = np.sqrt(np.maximum(radii_squared - dedendum_radius**2, 0))
+    trochoid_params = (geometry["trochoid_distance"] + temp) / geometry["pitch_radius"]
+
+    x1, y1 = trochoid_arrays(trochoid_params, geometry)
+    x2, y2 = involute_arrays(involute_params, geometry)
+    angle_diff = np.arctan2(x1 * y2 - y1 * x2, x1 * x2 + y1 * y2)
+
+    crossings = np.signbit(angle_diff[1:]) != np.signbit(angle_diff[:-1])
+    crossed = crossings.any(axis=0)
+    columns = np.arange(angle_diff.shape[1])
+
+    # curves only touch (no undercut), start from the closest approach
+    closest = np.minimum(np.argmin(np.abs(angle_diff), axis=0), samples - 2)
+    i = np.where(crossed, np.argmax(crossings, axis=0), closest)
+    before = angle_diff[i, columns]
+    after = angle_diff[i + 1, columns]
+    weight = np.where(crossed, before / np.where(crossed, before - after, 1), 0)
+
+    trochoid_guess = trochoid_params[i, columns] + weight * (
+        trochoid_params[i + 1, columns] - trochoid_params[i, columns]
+    )
+    involute_guess = involute_params[i, columns] + weight * (
+        involute_params[i + 1, columns] - involute_params[i, columns]
+    )
+    # the involute tangent vanishes on the base circle
+    involute_guess = np.where(
+        involute_guess == 0, involute_params[1] / 2, involute_guess
+    )
+    return trochoid_guess, involute_guess
+
+
+# newton_intersection on every combination at once, the ones that do not
+# converge inside the parameter bounds are flagged for the scalar solver
+def intersections(geometry, tolerance=1e-10, max_iterations=30):
+    t1, t2 = intersection_guesses(geometry)
+    tolerance = tolerance * geometry["pitch_radius"]
+    pitch_radius = geometry["pitch_radius"]
+    radius_diff = pitch_radius - geometry["dedendum_radius"]
+
+    for _ in range(max_iterations):
+        x1, y1 = trochoid_arrays(t1, geometry)
+        x2, y2 = involute_arrays(t2, geometry)
+        r0 = x1 - x2
+        r1 = y1 - y2
+        converged = np.maximum(np.abs(r0), np.abs(r1)) < tolerance
+        if converged.all():
+            break
+
+        theta1 = geometry["trochoid_beta"] - t1
+        temp1 = pitch_radius * t1 - geometry["trochoid_distance"]
+        a = radius_diff * np.cos(theta1) + temp1 * np.sin(theta1)
+        c = temp1 * np.cos(theta1) - radius_diff * np.sin(theta1)
+
+        theta2 = geometry["involute_beta"] + t2
+        temp2 = geometry["base_radius"] * t2
+        b = -temp2 * np.cos(theta2)
+        d = temp2 * np.sin(theta2)
+
+        det = a * d - b * c
+        step = ~converged & (det != 0)
+        det = np.where(step, det, 1)
+        t1 = t1 - np.where(step, (d * r0 - b * r1) / det, 0)
+        t2 = t2 - np.where(step, (a * r1 - c * r0) / det, 0)
+
+    x1, y1 = trochoid_arrays(t1, geometry)
+    x2, y2 = involute_arrays(t2, geometry)
+    solved = np.maximum(np.abs(x1 - x2), np.abs(y1 - y2)) < tolerance
+    solved &= (t1 >= 0) & (t1 <= 2) & (t2 >= 0) & (t2 <= 2)
+    return t1, t2, solved
+
+
+# involute_clip on every combination at once, where the flank crosses the
+# tooth center line
+def clip_params(involute_beta, guess, tolerance=1e-12, max_iterations=30):
+    param = guess
+    for _ in range(max_iterations):
+        theta = involute_beta + param
+        value = param * np.cos(theta) - np.sin(theta)
+        slope = -param * np.sin(theta)
+        step = (np.abs(value) >= tolerance) & (slope != 0)
+        if not step.any():
+            break
+        param = param - np.where(step, value / np.where(step, slope, 1), 0)
+    return param
+
+
+# the smallest radius of curvature along the root fillet, the trochoid from
+# the root circle to where it meets the involute. nan for a gear whose
+# trochoid has no bend, one without dedendum has no fillet at all
+def fillet_radii(geometry, trochoid_end, samples=16):
+    start = geometry["trochoid_distance"] / geometry["pitch_radius"]
+    params = np.linspace(start, np.maximum(trochoid_end, start), samples)
+
+    pitch_radius = geometry["pitch_radius"]
+    radius_diff = pitch_radius - geometry["dedendum_radius"]
+    theta = geometry["trochoid_beta"] - params
+    temp = pitch_radius * params - geometry["trochoid_distance"]
+    cos_theta = np.cos(theta)
+    sin_theta = np.sin(theta)
+
+    dx = radius_diff * cos_theta + temp * sin_theta
+    dy = temp * cos_theta - radius_diff * sin_theta
+    ddx = (radius_diff + pitch_radius) * sin_theta - temp * cos_theta
+    ddy = (radius_diff + pitch_radius) * cos_theta + temp * sin_theta
+
+    speed = np.hypot(dx, dy)
+    bend = np.abs(dx * ddy - dy * ddx)
+    bent = bend > 0
+    radii = np.where(bent, speed**3 / np.where(bent, bend, 1), np.inf).min(axis=0)
+    return np.where(bent.any(axis=0), radii, np.nan)
+
+
+# undercut, tip thickness, clip and root fillet radius of many gears at
+# once, keywords match gear_geometry, each a value or an array, angles in
+# degrees. returns a dict of arrays, one entry per combination
+def evaluate_profiles(
+    teeth=12,
+    module=2,
+    pressure_angle=20,
+    backlash_factor=0,
+    dedendum_factor=1.25,
+    addendum_factor=1,
+    profile_shift_factor=0,
+    fillet_samples=16,
+):
+    table = dict(
+        zip(
+            COLUMNS,
+            np.broadcast_arrays(
+                *[
+                    np.atleast_1d(np.asarray(value, dtype=float))
+                    for value in (
+                        teeth,
+                        module,
+                        pressure_angle,
+                        backlash_factor,
+                        dedendum_factor,
+                        addendum_factor,
+                        profile_shift_factor,
+                    )
+                ]
+            ),
+        )
+    )
+    table = {name: values.ravel().copy() for name, values in table.items()}
+
+    pressure_radians = np.radians(table["pressure_angle"])
+    geometry = geometry_arrays(
+        *[
+            pressure_radians if name == "pressure_angle" else table[name]
+            for name in COLUMNS
+        ]
+    )
+
+    trochoid_end, involute_start, solved = intersections(geometry)
+    # the few newton misses go through the scalar solver and its fallback
+    for i in np.flatnonzero(~solved):
+        trochoid_end[i], involute_start[i] = intersection(
+            *[geometry[name][i] for name in INTERSECTION_ARGS]
+        )
+
+    base_radius = geometry["base_radius"]
+    addendum_radius = geometry["addendum_radius"]
+    involute_end = np.sqrt(np.maximum((addendum_radius / base_radius) ** 2 - 1, 0))
+    tip_x, tip_y = involute_arrays(involute_end, geometry)
+    clip = tip_y < 0
+
+    clip_end = clip_params(geometry["involute_beta"], involute_end)
+    tip_radius = np.where(clip, base_radius * np.sqrt(1 + clip_end**2), addendum_radius)
+
+    dedendum = geometry["pitch_radius"] - geometry["dedendum_radius"]
+    table.update(
+        {
+            "undercut": dedendum
+            > geometry["pitch_radius"] * np.sin(pressure_radians) ** 2
+            + 1e-9 * table["module"],
+            "form_radius": base_radius * np.sqrt(1 + involute_start**2),
+            "base_radius": base_radius,
+            "tip_thickness": np.where(
+                clip, 0, 2 * addendum_radius * np.arctan2(tip_y, tip_x)
+            ),
+            "clip": clip,
+            "tip_radius": tip_radius,
+            "root_fillet_radius": fillet_radii(geometry, trochoid_end, fillet_samples),
+        }
+    )
+    return table
+
+
+# the table sorted best first: gears without undercut or clip and with a tip
+# at least min_tip_factor modules thick, then the ones without undercut, then
+# without clip, each by the root fillet radius in modules, the largest first.
+# gears without a root fillet are left out
+def rank_profiles(table, min_tip_factor=0.25):
+    table = {
+        name: values[np.isfinite(table["root_fillet_radius"])]
+        for name, values in table.items()
+    }
+    usable = (
+        ~table["undercut"]
+        & ~table["clip"]
+        & (table["tip_thickness"] >= min_tip_factor * table["module"])
+    )
+    order = np.lexsort(
+        (
+            -table["root_fillet_radius"] / table["module"],
+            table["clip"],
+            table["undercut"],
+            ~usable,
+        )
+    )
+    ranked = {name: values[order] for name, values in table.items()}
+    ranked["usable"] = usable[order]
+    return ranked
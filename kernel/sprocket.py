@@ -0,0 +1,263 @@
+import math
+
+import numpy as np
+
+try:
+    from macro.kernel.geometry import arc_segment
+    from macro.kernel.tooth import ToothProfile
+except ModuleNotFoundError:
+    from kernel.geometry import arc_segment
+    from kernel.tooth import ToothProfile
+
+
+# https://www.chiefdelphi.com/t/sprocket-design-tutorial/387449
+def tooth_arcs(
+    teeth,
+    pitch,
+    arc1radius,
+    arc3radius_factor,
+    arc2radius_factor,
+    arc1angle_factor,
+):
+    # general parameters
+    tooth_angle_half = math.pi / teeth
+    tooth_angle = tooth_angle_half * 2
+    pitch_radius = pitch / (2 * math.sin(tooth_angle_half))
+
+    # arc clearance parameters
+    arc1angle = math.pi / 2 - tooth_angle_half - arc1angle_factor
+    arc2radius = arc1radius * (1 + arc2radius_factor)
+
+    # clearance arc center
+    extra_dist = arc2radius_factor * arc1radius
+    arc2cx = pitch_radius + extra_dist * math.cos(arc1angle)
+    arc2cy = -extra_dist * math.sin(arc1angle)
+
+    # next tooth center
+    slot2x = pitch_radius * math.cos(tooth_angle)
+    slot2y = pitch_radius * math.sin(tooth_angle)
+
+    # vector from second to first
+    slot_dx = pitch_radius - slot2x
+    slot_dy = -slot2y
+
+    # change to move along centerline
+    center3dx = slot_dx * arc3radius_factor / 2
+    center3dy = slot_dy * arc3radius_factor / 2
+
+    # pitch arc parameters
+    arc3cx = slot2x + center3dx
+    arc3cy = slot2y + center3dy
+    arc3radius = math.hypot(arc3cx - arc2cx, arc3cy - arc2cy) - arc2radius
+
+    # arc2angle and arc3angle are arc angles
+    diffangle = math.atan2(arc3cy - arc2cy, arc2cx - arc3cx)
+    arc2angle = diffangle - arc1angle
+
+    middlex = (slot2x + pitch_radius) / 2
+    middley = slot2y / 2
+
+    dy = pitch_radius - middlex
+    dx = middley
+
+    # arc3radius**2 = (middlex - arc3cx + dx * f)**2 + (middley - arc3cy + dy * f)**2
+    # 0 = (dx**2 + dy**2) * f**2 + f*2*(dx*(middlex - arc3cx) + dy*(middley-arc3cy))
+    # + (middlex - arc3cx)**2 +  (middley - arc3cy)**2 - arc3radius**2
+
+    # -b +- sqrt(b**2 -4ac)/2a
+    a = dx**2 + dy**2
+    b = 2 * (dx * (middlex - arc3cx) + dy * (middley - arc3cy))
+    c = (middlex - arc3cx) ** 2 + (middley - arc3cy) ** 2 - arc3radius**2
+
+    # factor up the middle perpendicular
+    fsol = (math.sqrt(b**2 - 4 * a * c) - b) / (2 * a)
+    endx = middlex + dx * fsol
+    endy = middley + dy * fsol
+
+    arc3angle = arc1angle + arc2angle - math.atan2(arc3cy - endy, endx - arc3cx)
+
+    # arc 1
+    arc1p1 = np.array([pitch_radius - arc1radius, 0])
+    arc1p2 = np.array(
+        [
+            pitch_radius - arc1radius * math.cos(arc1angle / 2),
+            arc1radius * math.sin(arc1angle / 2),
+        ]
+    )
+    arc1p3 = np.array(
+        [
+            pitch_radius - arc1radius * math.cos(arc1angle),
+            arc1radius * math.sin(arc1angle),
+        ]
+    )
+
+    # arc 2
+    arc2p2 = np.array(
+        [
+            arc2cx - arc2radius * math.cos(arc1angle + arc2angle / 2),
+            arc2cy + arc2radius * math.sin(arc1angle + arc2angle / 2),
+        ]
+    )
+    arc2p3 = np.array(
+        [
+            arc2cx - arc2radius * math.cos(arc1angle + arc2angle),
+            arc2cy + arc2radius * math.sin(arc1angle + arc2angle),
+        ]
+    )
+
+    # arc 3
+    arc3p2 = np.array(
+        [
+            arc3cx + arc3radius * math.cos(arc1angle + arc2angle - arc3angle / 2),
+            arc3cy - arc3radius * math.sin(arc1angle + arc2angle - arc3angle / 2),
+        ]
+    )
+    arc3p3 = np.array(
+        [
+            arc3cx + arc3radius * math.cos(arc1angle + arc2angle - arc3angle),
+            arc3cy - arc3radius * math.sin(arc1angle + arc2angle - arc3angle),
+        ]
+    )
+
+    arcs = [arc_segment(arc1p1, arc1p2, arc1p3)]
+    if arc1angle_factor != 0:
+        arcs.append(arc_segment(arc1p3, arc2p2, arc2p3))
+    arcs.append(arc_segment(arc2p3, arc3p2, arc3p3))
+
+    return arcs
+
+
+# roller chains by ANSI B29.1 and ISO 606 (B series), pitch, roller
+# diameter, width between the inner plates and transverse pitch between
+# strands, in mm
+CHAINS = {
+    "ANSI 25": (6.35, 3.30, 3.18, 6.40),
+    "ANSI 35": (9.525, 5.08, 4.77, 10.13),
+    "ANSI 40": (12.7, 7.92, 7.85, 14.38),
+    "ANSI 50": (15.875, 10.16, 9.40, 18.11),
+    "ANSI 60": (19.05, 11.91, 12.57, 22.78),
+    "ANSI 80": (25.4, 15.88, 15.75, 29.29),
+    "ANSI 100": (31.75, 19.05, 18.90, 35.76),
+    "ANSI 120": (38.1, 22.23, 25.22, 45.44),
+    "ANSI 140": (44.45, 25.40, 25.22, 48.87),
+    "ANSI 160": (50.8, 28.58, 31.55, 58.55),
+    "ISO 05B": (8.0, 5.00, 3.00, 5.64),
+    "ISO 06B": (9.525, 6.35, 5.72, 10.24),
+    "ISO 08B": (12.7, 8.51, 7.75, 13.92),
+    "ISO 10B": (15.875, 10.16, 9.65, 16.59),
+    "ISO 12B": (19.05, 12.07, 11.68, 19.46),
+    "ISO 16B": (25.4, 15.88, 17.02, 31.88),
+    "ISO 20B": (31.75, 19.05, 19.56, 36.45),
+    "ISO 24B": (38.1, 25.40, 25.40, 48.36),
+}
+
+CHAIN_NAMES = ["Custom"] + list(CHAINS)
+
+
+# the middle of the ISO 606 seat radius range for a roller diameter
+def chain_seat_radius(roller_diameter):
+    return 0.505 * roller_diameter + 0.0345 * roller_diameter ** (1 / 3)
+
+
+# the seat clear angle in degrees, 25 - 135 / teeth but not below 0, which
+# opens the seat to the middle of the ISO 606 roller seating angle range.
+# teeth is a tooth count or an array of them, the result has its shape
+def auto_seat_clear_angle(teeth):
+    teeth = np.asarray(teeth, dtype=float)
+    return np.maximum(25 - 135 / teeth, 0)
+
+
+# the arguments of tooth_arcs, with the pitch and seat radius of a table
+# chain in place of the given ones
+def sprocket_profile(
+    teeth,
+    pitch,
+    seat_radius,
+    pitch_clear_factor,
+    seat_clear_factor,
+    seat_clear_angle,
+    chain="Custom",
+    auto_clear_angle=False,
+):
+    teeth = int(teeth)
+    chain = str(chain)
+    if chain != "Custom":
+        pitch, roller_diameter, _, _ = CHAINS[chain]
+        seat_radius = chain_seat_radius(roller_diameter)
+    if auto_clear_angle:
+        seat_clear_angle = float(auto_seat_clear_angle(teeth))
+
+    return (
+        teeth,
+        float(pitch),
+        float(seat_radius),
+        float(pitch_clear_factor),
+        float(seat_clear_factor),
+        math.radians(float(seat_clear_angle)),
+    )
+
+
+# pitch, outside, root and caliper diameters and the largest hub that clears
+# the chain (ANSI B29.1) and the automatic seat clear angle, for an array of
+# tooth counts at once
+def sprocket_dimensions(teeth, pitch=12.7, roller_diameter=7.92):
+    teeth = np.asarray(teeth, dtype=float)
+    half = np.pi / teeth
+    cotangent = 1 / np.tan(half)
+
+    pitch_diameter = pitch / np.sin(half)
+    root_diameter = pitch_diameter - roller_diameter
+    odd = teeth % 2 == 1
+    return {
+        "pitch_diameter": pitch_diameter,
+        "outside_diameter": pitch * (0.6 + cotangent),
+        "root_diameter": root_diameter,
+        # across the rollers of odd counts, which do not sit opposite
+        "caliper_diameter": np.where(
+            odd, pitch_diameter * np.cos(half / 2) - roller_diameter, root_diameter
+        ),
+        "hub_diameter": pitch * (cotangent - 1) - 0.76,
+        "seat_clear_angle": auto_seat_clear_angle(teeth),
+    }
+
+
+# keywords match sprocket_shape, angles in degrees
+def sprocket_arcs(
+    teeth=12,
+    pitch=12.7,
+    seat_radius=3.95,
+    pitch_clear_factor=0.4,
+    seat_clear_factor=0.8,
+    seat_clear_angle=35,
+    chain="Custom",
+    auto_clear_angle=False,
+):
+    return tooth_arcs(
+        *sprocket_profile(
+            teeth,
+            pitch,
+            seat_radius,
+            pitch_clear_factor,
+            seat_clear_factor,
+            seat_clear_angle,
+            chain,
+            auto_clear_angle,
+        )
+    )
+
+
+# the half tooth from seat center to tip, mirrored
+def sprocket_tooth(teeth=12, **sprocket):
+    return ToothProfile.from_segments(
+        sprocket_arcs(teeth, **sprocket), int(teeth), mirrored=True
+    )
+
+
+# one whole tooth from seat center to seat center
+def sprocket_segments(teeth=12, **sprocket):
+    return sprocket_tooth(teeth, **sprocket).whole().segments()
+
+
+# the closed outline of the whole sprocket, the last point joins the first
+def sprocket_polyline(teeth=12, points_per_arc=16, **sprocket):
+    return sprocket_tooth(teeth, **sprocket).outline(int(points_per_arc))
@@ -0,0 +1,101 @@
+import math
+
+import numpy as np
+
+try:
+    from macro.kernel.geometry import pattern_points, segments_polyline
+except ModuleNotFoundError:
+    from kernel.geometry import pattern_points, segments_polyline
+
+KINDS = ["arc", "spline"]
+
+
+# the segments of one tooth packed into contiguous float64 arrays, the point
+# rows of every segment one after another in points, segment i holding rows
+# offsets[i] to offsets[i + 1]. tangents has a row per point, nan for the
+# segments without them, or is None when none has them. a mirrored profile
+# holds half a tooth, from the tip center line to the gap center line, the
+# other half is its mirror about the gap center line
+class ToothProfile:
+    __slots__ = ("points", "tangents", "offsets", "kinds", "teeth", "mirrored")
+
+    def __init__(self, points, tangents, offsets, kinds, teeth, mirrored=False):
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        self.tangents = None
+        if tangents is not None:
+            self.tangents = np.ascontiguousarray(tangents, dtype=np.float64)
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        self.kinds = np.ascontiguousarray(kinds, dtype=np.uint8)
+        self.teeth = int(teeth)
+        self.mirrored = bool(mirrored)
+
+    @classmethod
+    def from_segments(cls, segments, teeth, mirrored=False):
+        lengths = [len(segment["points"]) for segment in segments]
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        points = np.concatenate([segment["points"] for segment in segments])
+
+        tangents = None
+        if any(segment.get("tangents") is not None for segment in segments):
+            tangents = np.full_like(points, np.nan, dtype=np.float64)
+            for start, segment in zip(offsets, segments):
+                if segment.get("tangents") is not None:
+                    tangents[start : start + len(segment["points"])] = segment[
+                        "tangents"
+                    ]
+
+        kinds = [KINDS.index(segment["kind"]) for segment in segments]
+        return cls(points, tangents, offsets, kinds, teeth, mirrored)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @property
+    def nbytes(self):
+        arrays = (self.points, self.tangents, self.offsets, self.kinds)
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def segment(self, index):
+        start, end = self.offsets[index], self.offsets[index + 1]
+        tangents = None
+        if self.tangents is not None and not np.isnan(self.tangents[start, 0]):
+            tangents = self.tangents[start:end]
+
+        segment = {"kind": KINDS[self.kinds[index]], "points": self.points[start:end]}
+        if segment["kind"] == "spline":
+            segment["tangents"] = tangents
+        return segment
+
+    # the segment dicts of kernel.geometry, views into the arrays
+    def segments(self):
+        return [self.segment(index) for index in range(len(self))]
+
+    # the whole tooth, a mirrored profile followed by its mirror. running the
+    # packed rows backwards reverses the segments and the points in each at
+    # once, the mirror then flips y and turns one tooth on
+    def whole(self):
+        if not self.mirrored:
+            return self
+
+        angle = 2 * math.pi / self.teeth
+        rotation = np.array(
+            [[math.cos(angle), math.sin(angle)], [math.sin(angle), -math.cos(angle)]]
+        )
+
+        points = np.concatenate((self.points, self.points[::-1] @ rotation))
+        tangents = None
+        if self.tangents is not None:
+            tangents = np.concatenate((self.tangents, -self.tangents[::-1] @ rotation))
+
+        count = len(self.points)
+        offsets = np.concatenate((self.offsets, 2 * count - self.offsets[-2::-1]))
+        kinds = np.concatenate((self.kinds, self.kinds[::-1]))
+        return ToothProfile(points, tangents, offsets, kinds, self.teeth)
+
+    # the whole tooth as a polyline, arcs by arc_count points
+    def polyline(self, arc_count=16):
+        return segments_polyline(self.whole().segments(), arc_count)
+
+    # the closed outline of every tooth, the last point joins the first
+    def outline(self, arc_count=16):
+        return pattern_points(self.polyline(arc_count), self.teeth)
@@ -0,0 +1,124 @@
+import Part
+import FreeCAD as App
+
+try:
+    from macro.common.cache import cached_edges
+    from macro.common.feature import Feature, memo
+    from macro.common.timing import stage
+    from macro.common.pattern import GENERATION_MODES, linear_pattern_solid
+    from macro.common.convert import to_vectors
+    from macro.kernel.rack import rack_outline, rack_profile
+except ModuleNotFoundError:
+    from common.cache import cached_edges
+    from common.feature import Feature, memo
+    from common.timing import stage
+    from common.pattern import GENERATION_MODES, linear_pattern_solid
+    from common.convert import to_vectors
+    from kernel.rack import rack_outline, rack_profile
+
+
+def outline_edges(profile, teeth, back_height):
+    with stage("profile"):
+        points = rack_outline(rack_profile(*profile), teeth, back_height)
+
+    with stage("wire"):
+        vectors = to_vectors(points)
+        return Part.makePolygon(vectors + vectors[:1]).Edges
+
+
+# the face of the whole rack, or of one tooth and the back under it for
+# ToothPattern
+def rack_face(profile, teeth, back_height):
+    edges = cached_edges("rack", outline_edges, (profile, teeth, back_height))
+
+    with stage("face"):
+        return Part.Face(Part.Wire(edges))
+
+
+# keywords are the Rack properties in snake case, angles in degrees, the
+# tooth keywords are those of the Gear it mates with. the teeth run along
+# +x from x = 0 and point to +y, the pitch line is y = 0
+def rack_shape(
+    teeth=20,
+    module=2,
+    height=6,
+    pressure_angle=20,
+    backlash_factor=0,
+    dedendum_factor=1.25,
+    addendum_factor=1,
+    profile_shift_factor=0,
+    back_height=4,
+    generation_mode="Outline",
+    *,
+    parts=None,
+):
+    teeth = int(teeth)
+    height = float(height)
+    back_height = float(back_height)
+    generation_mode = str(generation_mode)
+
+    if parts is None:
+        parts = {}
+
+    profile = (
+        float(module),
+        float(pressure_angle),
+        float(backlash_factor),
+        float(dedendum_factor),
+        float(addendum_factor),
+        float(profile_shift_factor),
+    )
+    # a tooth pattern face is one tooth long whatever the tooth count
+    face_teeth = 1 if generation_mode == "ToothPattern" else teeth
+    face = memo(
+        parts,
+        "profile",
+        (profile, face_teeth, back_height),
+        rack_face,
+        profile,
+        face_teeth,
+        back_height,
+    )
+    pitch = rack_profile(*profile)["pitch"]
+
+    with stage("extrude"):
+        face = face.copy()
+        face.translate(App.Vector(0, 0, -height / 2))
+        solid = face.extrude(App.Vector(0, 0, height))
+
+    if generation_mode == "ToothPattern":
+        with stage("pattern"):
+            solid = linear_pattern_solid(solid, pitch, teeth)
+
+    return solid, {"Length": teeth * pitch}
+
+
+class Rack(Feature):
+    shape = staticmethod(rack_shape)
+
+    def __init__(self, obj):
+        obj.Proxy = self
+        obj.addProperty("App::PropertyQuantity", "Teeth").Teeth = 20
+        obj.addProperty("App::PropertyLength", "Module").Module = 2
+        obj.addProperty("App::PropertyLength", "Height").Height = 6
+        obj.addProperty("App::PropertyAngle", "PressureAngle").PressureAngle = 20
+        obj.addProperty("App::PropertyQuantity", "BacklashFactor").BacklashFactor = 0
+        obj.addProperty("App::PropertyQuantity", "DedendumFactor").DedendumFactor = 1.25
+        obj.addProperty("App::PropertyQuantity", "AddendumFactor").AddendumFactor = 1
+        obj.addProperty(
+            "App::PropertyQuantity", "ProfileShiftFactor"
+        ).ProfileShiftFactor = 0
+        # below the root line
+        obj.addProperty("App::PropertyLength", "BackHeight").BackHeight = 4
+        obj.addProperty("App::PropertyEnumeration", "GenerationMode").GenerationMode = (
+            GENERATION_MODES
+        )
+        obj.addProperty("App::PropertyLength", "Length")
+        obj.setEditorMode("Length", 1)
+
+
+def make_rack():
+    obj = App.ActiveDocument.addObject("Part::FeaturePython", "Rack")
+    Rack(obj)
+    obj.ViewObject.Proxy = 0
+    App.ActiveDocument.recompute()
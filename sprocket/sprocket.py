@@ -1,10 +1,247 @@
 import Part
 import FreeCAD as App
-import math
 
+try:
+    from macro.common.cache import cached_edges
+    from macro.common.feature import Feature, memo
+    from macro.common.timing import stage
+    from macro.common.pattern import (
+        GENERATION_MODES,
+        bolt_circle_solid,
+        pattern_solid,
+        sector_edges,
+        sector_wire,
+    )
+    from macro.common.convert import profile_edges
+    from macro.common.detail import LEVELS_OF_DETAIL, PREVIEW_POINTS, preview_solid
+    from macro.kernel.sprocket import (
+        CHAIN_NAMES,
+        CHAINS,
+        sprocket_dimensions,
+        sprocket_profile,
+        tooth_arcs,
+    )
+    from macro.kernel.geometry import sector_polyline, sector_teeth
+    from macro.kernel.tooth import ToothProfile
+except ModuleNotFoundError:
+    from common.cache import cached_edges
+    from common.feature import Feature, memo
+    from common.timing import stage
+    from common.pattern import (
+        GENERATION_MODES,
+        bolt_circle_solid,
+        pattern_solid,
+        sector_edges,
+        sector_wire,
+    )
+    from common.convert import profile_edges
+    from common.detail import LEVELS_OF_DETAIL, PREVIEW_POINTS, preview_solid
+    from kernel.sprocket import (
+        CHAIN_NAMES,
+        CHAINS,
+        sprocket_dimensions,
+        sprocket_profile,
+        tooth_arcs,
+    )
+    from kernel.geometry import sector_polyline, sector_teeth
+    from kernel.tooth import ToothProfile
+
+
+def tooth_edges(
+    teeth,
+    pitch,
+    arc1radius,
+    arc3radius_factor,
+    arc2radius_factor,
+    arc1angle_factor,
+):
+    segments = tooth_arcs(
+        teeth,
+        pitch,
+        arc1radius,
+        arc3radius_factor,
+        arc2radius_factor,
+        arc1angle_factor,
+    )
+    return profile_edges(ToothProfile.from_segments(segments, teeth, mirrored=True))
+
+
+# the face of the whole outline, of count teeth from tooth first on closed
+# at the center, or of one tooth sector for ToothPattern
+def sprocket_face(profile, generation_mode, first, count):
+    with stage("profile"):
+        edges = cached_edges("sprocket", tooth_edges, profile)
+
+    if generation_mode == "ToothPattern":
+        with stage("face"):
+            return Part.Face(sector_wire(edges, 0))
+
+    teeth = profile[0]
+
+    with stage("wire"):
+        edges = sector_edges(edges, teeth, first, count)
+        if count != teeth:
+            wire = sector_wire(edges, 0)
+        else:
+            wire = Part.Wire(edges)
+
+    with stage("face"):
+        return Part.Face(wire)
+
+
+# one strand, the face extruded by height, patterned for ToothPattern
+def strand_solid(face, teeth, height, generation_mode, first, count):
+    with stage("extrude"):
+        solid = face.extrude(App.Vector(0, 0, height))
+
+    if generation_mode == "ToothPattern":
+        with stage("pattern"):
+            return pattern_solid(solid, teeth, count, first)
+
+    return solid
+
+
+# a coarse polyline strand of count teeth from tooth first on for a Preview
+def preview_strand(profile, first, count, height):
+    teeth = profile[0]
+    with stage("sampling"):
+        tooth = ToothProfile.from_segments(tooth_arcs(*profile), teeth, mirrored=True)
+        points = sector_polyline(tooth.polyline(PREVIEW_POINTS), teeth, first, count)
+
+    return preview_solid(points, 0, height)
+
+
+# keywords are the Sprocket properties in snake case, angles in degrees. a
+# table chain sets the pitch, seat radius and strand spacing. more strands
+# are translated copies of the first, joined by a hub
+def sprocket_shape(
+    teeth=12,
+    pitch=12.7,
+    height=3,
+    seat_radius=3.95,
+    pitch_clear_factor=0.4,
+    seat_clear_factor=0.8,
+    seat_clear_angle=35,
+    generation_mode="Outline",
+    chain="Custom",
+    auto_clear_angle=False,
+    strands=1,
+    strand_spacing=0,
+    hub_diameter=0,
+    hub_length=0,
+    start_angle=0,
+    end_angle=360,
+    bolt_circle_diameter=0,
+    bolt_diameter=0,
+    bolt_count=0,
+    level_of_detail="Full",
+    *,
+    parts=None,
+):
+    height = float(height)
+    generation_mode = str(generation_mode)
+    chain = str(chain)
+    strands = int(strands)
+    strand_spacing = float(strand_spacing)
+    hub_diameter = float(hub_diameter)
+    hub_length = float(hub_length)
+    bolts = (float(bolt_circle_diameter), float(bolt_diameter), int(bolt_count))
+    level_of_detail = str(level_of_detail)
+
+    if parts is None:
+        parts = {}
+
+    profile = sprocket_profile(
+        teeth,
+        pitch,
+        seat_radius,
+        pitch_clear_factor,
+        seat_clear_factor,
+        seat_clear_angle,
+        chain,
+        auto_clear_angle,
+    )
+    teeth, pitch = profile[:2]
+    roller_diameter = 2 * profile[2]
+    if chain != "Custom":
+        _, roller_diameter, _, transverse_pitch = CHAINS[chain]
+        strand_spacing = strand_spacing or transverse_pitch
+
+    first, count = sector_teeth(teeth, float(start_angle), float(end_angle))
+    sector = (360 / teeth * first, 360 / teeth * (first + count))
+
+    dimensions = sprocket_dimensions(teeth, pitch, roller_diameter)
+    outputs = {
+        "PitchDiameter": float(dimensions["pitch_diameter"]),
+        "OutsideDiameter": float(dimensions["outside_diameter"]),
+    }
+
+    # a Preview extrudes a coarse polyline, without the tooth pattern
+    if level_of_detail == "Preview":
+        preview = (profile, first, count, height)
+        solid = memo(parts, "preview", preview, preview_strand, *preview)
+    else:
+        # a height edit only extrudes the kept face again, a strand or hub
+        # edit only places the kept strand again
+        face = memo(
+            parts,
+            "profile",
+            (profile, generation_mode, first, count),
+            sprocket_face,
+            profile,
+            generation_mode,
+            first,
+            count,
+        )
+        solid = memo(
+            parts,
+            "strand",
+            (profile, generation_mode, first, count, height),
+            strand_solid,
+            face,
+            teeth,
+            height,
+            generation_mode,
+            first,
+            count,
+        )
+
+    if strands == 1 and hub_length == 0:
+        with stage("holes"):
+            return bolt_circle_solid(solid, *bolts, *sector), outputs
+    if count != teeth:
+        raise ValueError("a sprocket sector takes one strand and no hub")
+    if strands > 1 and strand_spacing < height:
+        raise ValueError(
+            "strand spacing {} is less than the height {}".format(
+                strand_spacing, height
+            )
+        )
+
+    with stage("strands"):
+        bodies = []
+        for k in range(1, strands):
+            copy = solid.copy()
+            copy.translate(App.Vector(0, 0, k * strand_spacing))
+            bodies.append(copy)
+
+        length = (strands - 1) * strand_spacing + height + hub_length
+        bodies.append(
+            Part.makeCylinder(
+                (hub_diameter or float(dimensions["hub_diameter"])) / 2, length
+            )
+        )
+
+    with stage("fuse"):
+        solid = solid.multiFuse(bodies).removeSplitter()
+
+    with stage("holes"):
+        return bolt_circle_solid(solid, *bolts, *sector), outputs
+
+
+class Sprocket(Feature):
+    shape = staticmethod(sprocket_shape)
 
-# https://www.chiefdelphi.com/t/sprocket-design-tutorial/387449
-class Sprocket:
     def __init__(self, obj):
         obj.Proxy = self
         obj.addProperty("App::PropertyQuantity", "Teeth").Teeth = 12
@@ -16,148 +253,40 @@ class Sprocket:
             "App::PropertyQuantity", "PitchClearFactor"
         ).PitchClearFactor = 0.4
         # 0 = no clearance up to something
-        obj.addProperty(
-            "App::PropertyQuantity", "SeatClearFactor"
-        ).SeatClearFactor = 0.8
-        # this will probably have to change for different gear tooth count
-        obj.addProperty("App::PropertyAngle", "SeatClearAngle").SeatClearAngle = 35
-
-    def execute(self, obj):
-        teeth = int(obj.Teeth)
-        pitch = float(obj.Pitch)
-        height = float(obj.Height)
-        arc1radius = float(obj.SeatRadius)
-
-        arc3radius_factor = float(obj.PitchClearFactor)
-        arc2radius_factor = float(obj.SeatClearFactor)
-        arc1angle_factor = float(obj.SeatClearAngle) * math.pi / 180
-
-        # general parameters
-        tooth_angle_half = math.pi / teeth
-        tooth_angle = tooth_angle_half * 2
-        pitch_radius = pitch / (2 * math.sin(tooth_angle_half))
-
-        # arc clearance parameters
-        arc1angle = math.pi / 2 - tooth_angle_half - arc1angle_factor
-        arc2radius = arc1radius * (1 + arc2radius_factor)
-
-        # clearance arc center
-        extra_dist = arc2radius_factor * arc1radius
-        arc2cx = pitch_radius + extra_dist * math.cos(arc1angle)
-        arc2cy = -extra_dist * math.sin(arc1angle)
-
-        # next tooth center
-        slot2x = pitch_radius * math.cos(tooth_angle)
-        slot2y = pitch_radius * math.sin(tooth_angle)
-
-        # vector from second to first
-        slot_dx = pitch_radius - slot2x
-        slot_dy = -slot2y
-
-        # change to move along centerline
-        center3dx = slot_dx * arc3radius_factor / 2
-        center3dy = slot_dy * arc3radius_factor / 2
-
-        # pitch arc parameters
-        arc3cx = slot2x + center3dx
-        arc3cy = slot2y + center3dy
-        arc3radius = math.hypot(arc3cx - arc2cx, arc3cy - arc2cy) - arc2radius
-
-        # arc2angle and arc3angle are arc angles
-        diffangle = math.atan2(arc3cy - arc2cy, arc2cx - arc3cx)
-        arc2angle = diffangle - arc1angle
-
-        middlex = (slot2x + pitch_radius) / 2
-        middley = slot2y / 2
-
-        dy = pitch_radius - middlex
-        dx = middley
-
-        # arc3radius**2 = (middlex - arc3cx + dx * f)**2 + (middley - arc3cy + dy * f)**2
-        # 0 = (dx**2 + dy**2) * f**2 + f*2*(dx*(middlex - arc3cx) + dy*(middley-arc3cy))
-        # + (middlex - arc3cx)**2 +  (middley - arc3cy)**2 - arc3radius**2
-
-        # -b +- sqrt(b**2 -4ac)/2a
-        a = dx**2 + dy**2
-        b = 2 * (dx * (middlex - arc3cx) + dy * (middley - arc3cy))
-        c = (middlex - arc3cx) ** 2 + (middley - arc3cy) ** 2 - arc3radius**2
-
-        # factor up the middle perpendicular
-        fsol = (math.sqrt(b**2 - 4 * a * c) - b) / (2 * a)
-        endx = middlex + dx * fsol
-        endy = middley + dy * fsol
-
-        arc3angle = arc1angle + arc2angle - math.atan2(arc3cy - endy, endx - arc3cx)
-
-        # arc 1
-        arc1p1 = App.Vector(pitch_radius - arc1radius, 0, 0)
-        arc1p2 = App.Vector(
-            pitch_radius - arc1radius * math.cos(arc1angle / 2),
-            arc1radius * math.sin(arc1angle / 2),
-            0,
-        )
-        arc1p3 = App.Vector(
-            pitch_radius - arc1radius * math.cos(arc1angle),
-            arc1radius * math.sin(arc1angle),
-            0,
+        obj.addProperty("App::PropertyQuantity", "SeatClearFactor").SeatClearFactor = (
+            0.8
         )
-
-        # arc 2
-        arc2p2 = App.Vector(
-            arc2cx - arc2radius * math.cos(arc1angle + arc2angle / 2),
-            arc2cy + arc2radius * math.sin(arc1angle + arc2angle / 2),
-            0,
-        )
-        arc2p3 = App.Vector(
-            arc2cx - arc2radius * math.cos(arc1angle + arc2angle),
-            arc2cy + arc2radius * math.sin(arc1angle + arc2angle),
-            0,
-        )
-
-        # arc 3
-        arc3p2 = App.Vector(
-            arc3cx + arc3radius * math.cos(arc1angle + arc2angle - arc3angle / 2),
-            arc3cy - arc3radius * math.sin(arc1angle + arc2angle - arc3angle / 2),
-            0,
+        # ignored with AutoClearAngle, which follows the tooth count
+        obj.addProperty("App::PropertyAngle", "SeatClearAngle").SeatClearAngle = 35
+        obj.addProperty("App::PropertyEnumeration", "GenerationMode").GenerationMode = (
+            GENERATION_MODES
         )
-        arc3p3 = App.Vector(
-            arc3cx + arc3radius * math.cos(arc1angle + arc2angle - arc3angle),
-            arc3cy - arc3radius * math.sin(arc1angle + arc2angle - arc3angle),
-            0,
+        # a table chain sets Pitch, SeatRadius and StrandSpacing
+        obj.addProperty("App::PropertyEnumeration", "Chain").Chain = CHAIN_NAMES
+        obj.addProperty("App::PropertyBool", "AutoClearAngle").AutoClearAngle = False
+        obj.addProperty("App::PropertyQuantity", "Strands").Strands = 1
+        # 0 = the transverse pitch of the chain
+        obj.addProperty("App::PropertyLength", "StrandSpacing").StrandSpacing = 0
+        # 0 = the largest hub that clears the chain
+        obj.addProperty("App::PropertyLength", "HubDiameter").HubDiameter = 0
+        obj.addProperty("App::PropertyLength", "HubLength").HubLength = 0
+        # only the whole teeth between the angles are made
+        obj.addProperty("App::PropertyAngle", "StartAngle").StartAngle = 0
+        obj.addProperty("App::PropertyAngle", "EndAngle").EndAngle = 360
+        # 0 = no bolt holes, they are spread evenly over the sector
+        obj.addProperty(
+            "App::PropertyLength", "BoltCircleDiameter"
+        ).BoltCircleDiameter = 0
+        obj.addProperty("App::PropertyLength", "BoltDiameter").BoltDiameter = 0
+        obj.addProperty("App::PropertyQuantity", "BoltCount").BoltCount = 0
+        # Preview while editing, finalize.fcmacro sets Full
+        obj.addProperty("App::PropertyEnumeration", "LevelOfDetail").LevelOfDetail = (
+            LEVELS_OF_DETAIL
         )
-
-        arc1 = Part.Arc(arc1p1, arc1p2, arc1p3)
-        arc3 = Part.Arc(arc2p3, arc3p2, arc3p3)
-
-        if arc1angle_factor == 0:
-            edges = [arc1.toShape(), arc3.toShape()]
-        else:
-            arc2 = Part.Arc(arc1p3, arc2p2, arc2p3)
-            edges = [arc1.toShape(), arc2.toShape(), arc3.toShape()]
-
-        center = App.Vector(0, 0, 0)
-        xaxis = App.Vector(1, 0, 0)
-        zaxis = App.Vector(0, 0, 1)
-
-        tooth_edges = edges.copy()
-        num_edges = len(edges)
-        for i in range(num_edges):
-            tooth_edges.append(
-                edges[num_edges - 1 - i]
-                .copy()
-                .rotate(center, xaxis, 180)
-                .rotate(center, zaxis, 360 / teeth)
-            )
-
-        all_edges = tooth_edges.copy()
-        for t in range(1, teeth):
-            for edge in tooth_edges:
-                all_edges.append(edge.copy().rotate(center, zaxis, 360 / teeth * t))
-
-        wire = Part.Wire(all_edges)
-        face = Part.Face(wire)
-
-        obj.Shape = face.extrude(App.Vector(0, 0, height))
+        obj.addProperty("App::PropertyLength", "PitchDiameter")
+        obj.setEditorMode("PitchDiameter", 1)
+        obj.addProperty("App::PropertyLength", "OutsideDiameter")
+        obj.setEditorMode("OutsideDiameter", 1)
 
 
 def make_sprocket():
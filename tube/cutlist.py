@@ -0,0 +1,236 @@
+import math
+
+import Part
+import FreeCAD as App
+
+try:
+    from macro.common.cache import normalize
+    from macro.common.feature import Feature, memo
+    from macro.common.timing import stage
+    from macro.tube.tube import tube_face
+except ModuleNotFoundError:
+    from common.cache import normalize
+    from common.feature import Feature, memo
+    from common.timing import stage
+    from tube.tube import tube_face
+
+YAXIS = App.Vector(0, 1, 0)
+
+
+def round_rect_area(widthd2, heightd2, radius):
+    return 4 * widthd2 * heightd2 - (4 - math.pi) * radius**2
+
+
+def section_area(widthd2, heightd2, fillet, thickness):
+    return round_rect_area(widthd2, heightd2, fillet) - round_rect_area(
+        widthd2 - thickness, heightd2 - thickness, max(0, fillet - thickness)
+    )
+
+
+# z of the holes along a member, on pitch from inset at the start
+def hole_positions(length, hole_pitch, hole_inset):
+    if hole_pitch <= 0:
+        return []
+    count = int(math.floor((length - 2 * hole_inset) / hole_pitch + 1e-9)) + 1
+    return [hole_inset + k * hole_pitch for k in range(max(count, 0))]
+
+
+# the members as (length, start miter, end miter), a missing miter is square
+def members(lengths, start_miters, end_miters):
+    result = []
+    for i, length in enumerate(lengths):
+        start = start_miters[i] if i < len(start_miters) else 0
+        end = end_miters[i] if i < len(end_miters) else 0
+        for miter in (start, end):
+            if abs(miter) >= 90:
+                raise ValueError("miter {} is not below 90 degrees".format(miter))
+        result.append((float(length), float(start), float(end)))
+    return result
+
+
+# one member from the shared section face, along z from 0 to length on the
+# center line, the ends turned about y by the miters and the holes drilled
+# along y through both walls
+def member_solid(face, section, member, hole_diameter, hole_pitch, hole_inset):
+    widthd2, heightd2 = section[:2]
+    length, start, end = member
+    start_slope = math.tan(math.radians(start))
+    end_slope = math.tan(math.radians(end))
+    before = widthd2 * abs(start_slope)
+    after = widthd2 * abs(end_slope)
+
+    with stage("extrude"):
+        face = face.copy()
+        face.translate(App.Vector(0, 0, -before))
+        solid = face.extrude(App.Vector(0, 0, length + before + after))
+
+    if start != 0 or end != 0:
+        with stage("miter"):
+            # the end planes through the center line, as one prism across y
+            reach = widthd2 + 1
+            corners = [
+                App.Vector(-reach, -heightd2 - 1, -reach * start_slope),
+                App.Vector(reach, -heightd2 - 1, reach * start_slope),
+                App.Vector(reach, -heightd2 - 1, length + reach * end_slope),
+                App.Vector(-reach, -heightd2 - 1, length - reach * end_slope),
+            ]
+            prism = Part.Face(Part.makePolygon(corners + corners[:1]))
+            solid = solid.common(prism.extrude(App.Vector(0, 2 * heightd2 + 2, 0)))
+
+    positions = hole_positions(length, hole_pitch, hole_inset)
+    if hole_diameter > 0 and positions:
+        with stage("holes"):
+            drills = [
+                Part.makeCylinder(
+                    hole_diameter / 2,
+                    2 * heightd2 + 2,
+                    App.Vector(0, -heightd2 - 1, z),
+                    YAXIS,
+                )
+                for z in positions
+            ]
+            solid = solid.cut(Part.makeCompound(drills))
+
+    return solid
+
+
+# the cut list rows, identical members counted together in first use order,
+# weights in kg from the density in g/cm3
+def cut_list(section, members, hole_diameter, hole_pitch, hole_inset, density):
+    _, _, _, thickness = section
+    area = section_area(*section)
+
+    rows = {}
+    for member in members:
+        if member in rows:
+            rows[member]["count"] += 1
+            continue
+
+        length = member[0]
+        holes = 0
+        if hole_diameter > 0:
+            holes = len(hole_positions(length, hole_pitch, hole_inset))
+        # ends turned through the center line leave its volume as it is
+        volume = area * length - holes * 2 * thickness * math.pi * hole_diameter**2 / 4
+        rows[member] = {
+            "length": length,
+            "start_miter": member[1],
+            "end_miter": member[2],
+            "holes": holes,
+            "count": 1,
+            "weight": volume * density * 1e-6,
+        }
+
+    return list(rows.values())
+
+
+def cut_list_lines(rows):
+    return [
+        "{count} x {length:g} mm, miters {start_miter:g}/{end_miter:g}, "
+        "{holes} holes, {weight:.3f} kg".format(**row)
+        for row in rows
+    ]
+
+
+# keywords are the TubeSet properties in snake case. every member shares
+# the one section face and identical members share one body, laid out side
+# by side along x with spacing between them
+def tube_set_shape(
+    width=25.4,
+    height=25.4,
+    fillet=5,
+    thickness=3,
+    lengths=(250,),
+    start_miters=(),
+    end_miters=(),
+    hole_diameter=0,
+    hole_pitch=50,
+    hole_inset=25,
+    density=7.85,
+    spacing=10,
+    *,
+    parts=None,
+):
+    section = (float(width) / 2, float(height) / 2, float(fillet), float(thickness))
+    members_list = members(lengths, start_miters, end_miters)
+    holes = (float(hole_diameter), float(hole_pitch), float(hole_inset))
+    density = float(density)
+    spacing = float(spacing)
+
+    if parts is None:
+        parts = {}
+
+    face = memo(parts, "profile", section, tube_face, *section)
+
+    # each unique member is kept under its own name, the ones no longer in
+    # the list are dropped
+    bodies = {}
+    for member in members_list:
+        if member not in bodies:
+            name = "member " + normalize(member)
+            bodies[member] = memo(
+                parts,
+                name,
+                (section, holes),
+                member_solid,
+                face,
+                section,
+                member,
+                *holes,
+            )
+    names = {"member " + normalize(member) for member in bodies}
+    for name in [name for name in parts if name.startswith("member ")]:
+        if name not in names:
+            del parts[name]
+
+    with stage("layout"):
+        step = 2 * section[0] + spacing
+        placed = []
+        for i, member in enumerate(members_list):
+            body = bodies[member].copy()
+            body.translate(App.Vector(i * step, 0, 0))
+            placed.append(body)
+
+    rows = cut_list(section, members_list, *holes, density)
+    return Part.makeCompound(placed), {
+        "CutList": cut_list_lines(rows),
+        "TotalLength": sum(member[0] for member in members_list),
+        "TotalWeight": sum(row["weight"] * row["count"] for row in rows),
+    }
+
+
+class TubeSet(Feature):
+    shape = staticmethod(tube_set_shape)
+
+    def __init__(self, obj):
+        obj.Proxy = self
+        obj.addProperty("App::PropertyLength", "Width").Width = 25.4
+        obj.addProperty("App::PropertyLength", "Height").Height = 25.4
+        obj.addProperty("App::PropertyLength", "Fillet").Fillet = 5
+        obj.addProperty("App::PropertyLength", "Thickness").Thickness = 3
+        # one entry per member, along the center line
+        obj.addProperty("App::PropertyFloatList", "Lengths").Lengths = [250]
+        # degrees about the height axis, missing entries are square
+        obj.addProperty("App::PropertyFloatList", "StartMiters").StartMiters = []
+        obj.addProperty("App::PropertyFloatList", "EndMiters").EndMiters = []
+        # 0 = no holes
+        obj.addProperty("App::PropertyLength", "HoleDiameter").HoleDiameter = 0
+        obj.addProperty("App::PropertyLength", "HolePitch").HolePitch = 50
+        obj.addProperty("App::PropertyLength", "HoleInset").HoleInset = 25
+        # g/cm3, steel
+        obj.addProperty("App::PropertyFloat", "Density").Density = 7.85
+        obj.addProperty("App::PropertyLength", "Spacing").Spacing = 10
+        obj.addProperty("App::PropertyStringList", "CutList")
+        obj.setEditorMode("CutList", 1)
+        obj.addProperty("App::PropertyLength", "TotalLength")
+        obj.setEditorMode("TotalLength", 1)
+        # kg
+        obj.addProperty("App::PropertyFloat", "TotalWeight")
+        obj.setEditorMode("TotalWeight", 1)
+
+
+def make_tube_set():
+    obj = App.ActiveDocument.addObject("Part::FeaturePython", "TubeSet")
+    TubeSet(obj)
+    obj.ViewObject.Proxy = 0
+    App.ActiveDocument.recompute()
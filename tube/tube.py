@@ -2,6 +2,15 @@ import Part
 import FreeCAD as App
 import math
 
+try:
+    from macro.common.feature import Feature, memo
+    from macro.common.detail import LEVELS_OF_DETAIL
+    from macro.common.timing import stage
+except ModuleNotFoundError:
+    from common.feature import Feature, memo
+    from common.detail import LEVELS_OF_DETAIL
+    from common.timing import stage
+
 def point(x, y):
     return App.Vector(x, y, 0)
 
@@ -11,7 +20,11 @@ def line(p1, p2):
 def arc(p1, p2, p3):
     return Part.Edge(Part.Arc(p1, p2, p3))
 
-def round_rect(widthd2, heightd2, radius):
+# a Preview cuts the corners straight
+def chamfer(p1, p2, p3):
+    return line(p1, p3)
+
+def round_rect(widthd2, heightd2, radius, preview=False):
     width = widthd2
     height = heightd2
 
@@ -33,6 +46,7 @@ def round_rect(widthd2, heightd2, radius):
     arc_distance = radius * math.sqrt(2)/2
     arc_width = comp_width + arc_distance
     arc_height = comp_height + arc_distance
+    corner = chamfer if preview else arc
 
     p1a = point(width, comp_height)
     p1b = point(comp_width, height)
@@ -43,18 +57,47 @@ def round_rect(widthd2, heightd2, radius):
     p4a = point(comp_width, -height)
     p4b = point(width, -comp_height)
     
-    edges.append(arc(p1a, point(arc_width, arc_height), p1b))
+    edges.append(corner(p1a, point(arc_width, arc_height), p1b))
     edges.append(line(p1b, p2a))
-    edges.append(arc(p2a, point(-arc_width, arc_height), p2b))
+    edges.append(corner(p2a, point(-arc_width, arc_height), p2b))
     edges.append(line(p2b, p3a))
-    edges.append(arc(p3a, point(-arc_width, -arc_height), p3b))
+    edges.append(corner(p3a, point(-arc_width, -arc_height), p3b))
     edges.append(line(p3b, p4a))
-    edges.append(arc(p4a, point(arc_width, -arc_height), p4b))
+    edges.append(corner(p4a, point(arc_width, -arc_height), p4b))
     edges.append(line(p4b, p1a))
 
     return Part.Wire(edges)
 
-class Tube:
+# keywords are the Tube properties in snake case
+def tube_face(widthd2, heightd2, fillet, thickness, preview=False):
+    with stage("wire"):
+        outer = round_rect(widthd2, heightd2, fillet, preview)
+        inner = round_rect(widthd2-thickness, heightd2-thickness, max(0, fillet-thickness), preview)
+
+    with stage("face"):
+        return Part.makeFace([outer, inner])
+
+def tube_shape(width=25.4, height=25.4, fillet=5, thickness=3, length=250, level_of_detail="Full", *, parts=None):
+    widthd2 = float(width) / 2
+    heightd2 = float(height) / 2
+    fillet = float(fillet)
+    thickness = float(thickness)
+    length = float(length)
+    preview = str(level_of_detail) == "Preview"
+
+    if parts is None:
+        parts = {}
+
+    # a length edit only extrudes the kept section again
+    section = (widthd2, heightd2, fillet, thickness, preview)
+    face = memo(parts, "profile", section, tube_face, *section).copy()
+    face.translate(App.Vector(0, 0, -length/2))
+    with stage("extrude"):
+        return face.extrude(App.Vector(0, 0, length)), {}
+
+class Tube(Feature):
+    shape = staticmethod(tube_shape)
+
     def __init__(self, obj):
         obj.Proxy = self
         obj.addProperty("App::PropertyLength","Width").Width = 25.4
@@ -62,20 +105,8 @@ class Tube:
         obj.addProperty("App::PropertyLength","Fillet").Fillet = 5
         obj.addProperty("App::PropertyLength","Thickness").Thickness = 3
         obj.addProperty("App::PropertyLength","Length").Length = 250
-
-    def execute(self, obj):
-        widthd2 = float(obj.Width) / 2
-        heightd2 = float(obj.Height) / 2
-        fillet = float(obj.Fillet)
-        thickness = float(obj.Thickness)
-        length = float(obj.Length)
-
-        outer = round_rect(widthd2, heightd2, fillet)
-        inner = round_rect(widthd2-thickness, heightd2-thickness, max(0, fillet-thickness))
-
-        face = Part.makeFace([outer, inner])
-        face.translate(App.Vector(0, 0, -length/2))
-        obj.Shape = face.extrude(App.Vector(0, 0, length))
+        # Preview while editing, finalize.fcmacro sets Full
+        obj.addProperty("App::PropertyEnumeration","LevelOfDetail").LevelOfDetail = LEVELS_OF_DETAIL
  
 def make_tube():
     obj = App.ActiveDocument.addObject("Part::FeaturePython","Tube")
@@ -0,0 +1,157 @@
+import math
+
+import Part
+import FreeCAD as App
+
+try:
+    from macro.common.cache import cached_edges
+    from macro.common.feature import Feature, memo
+    from macro.common.timing import stage
+    from macro.kernel.rack import rack_profile, thread_section
+except ModuleNotFoundError:
+    from common.cache import cached_edges
+    from common.feature import Feature, memo
+    from common.timing import stage
+    from kernel.rack import rack_profile, thread_section
+
+CENTER = App.Vector(0, 0, 0)
+ZAXIS = App.Vector(0, 0, 1)
+
+
+def section_edges(profile, pitch_radius):
+    with stage("profile"):
+        geometry = rack_profile(*profile)
+        root_radius = pitch_radius - geometry["dedendum"]
+        section = thread_section(
+            geometry, pitch_radius, min(geometry["dedendum"], root_radius) / 2
+        )
+
+    with stage("wire"):
+        vectors = [App.Vector(r, 0, z) for r, z in section.tolist()]
+        return Part.makePolygon(vectors + vectors[:1]).Edges
+
+
+# the closed axial section of one thread in the xz plane
+def section_wire(profile, pitch_radius):
+    return Part.Wire(cached_edges("worm", section_edges, (profile, pitch_radius)))
+
+
+# one thread swept a lead past both ends of the worm, centered on z = 0
+def thread_solid(wire, pitch_radius, lead, length, left_handed):
+    with stage("sweep"):
+        helix = Part.makeHelix(lead, length + 2 * lead, pitch_radius, 0, left_handed)
+
+        pipe_shell = Part.BRepOffsetAPI.MakePipeShell(helix)
+        pipe_shell.setFrenetMode(True)
+        pipe_shell.add(wire)
+        pipe_shell.build()
+        pipe_shell.makeSolid()
+
+        solid = pipe_shell.shape()
+        solid.translate(App.Vector(0, 0, -lead - length / 2))
+        return solid
+
+
+# keywords are the Worm properties in snake case, angles in degrees, the
+# tooth keywords are those of the Gear it mates with, the module is the
+# axial one. the axis is z, the worm centered on z = 0
+def worm_shape(
+    starts=1,
+    module=2,
+    pitch_diameter=20,
+    length=30,
+    left_handed=False,
+    pressure_angle=20,
+    backlash_factor=0,
+    dedendum_factor=1.25,
+    addendum_factor=1,
+    profile_shift_factor=0,
+    *,
+    parts=None,
+):
+    starts = int(starts)
+    module = float(module)
+    pitch_radius = float(pitch_diameter) / 2
+    length = float(length)
+    left_handed = bool(left_handed)
+
+    if parts is None:
+        parts = {}
+
+    profile = (
+        module,
+        float(pressure_angle),
+        float(backlash_factor),
+        float(dedendum_factor),
+        float(addendum_factor),
+        float(profile_shift_factor),
+    )
+    geometry = rack_profile(*profile)
+    lead = starts * geometry["pitch"]
+    root_radius = pitch_radius - geometry["dedendum"]
+    outer_radius = pitch_radius + geometry["addendum"]
+
+    # a start or length edit sweeps the kept section again, every start is
+    # a turned copy of the one sweep
+    section = (profile, pitch_radius)
+    wire = memo(parts, "profile", section, section_wire, profile, pitch_radius)
+    thread = memo(
+        parts,
+        "thread",
+        (section, lead, length, left_handed),
+        thread_solid,
+        wire,
+        pitch_radius,
+        lead,
+        length,
+        left_handed,
+    )
+
+    with stage("pattern"):
+        threads = [
+            thread.copy().rotate(CENTER, ZAXIS, 360 / starts * s)
+            for s in range(1, starts)
+        ]
+
+    with stage("fuse"):
+        bottom = App.Vector(0, 0, -length / 2)
+        core = Part.makeCylinder(root_radius, length, bottom)
+        body = core.multiFuse([thread] + threads)
+        body = body.common(Part.makeCylinder(outer_radius + module, length, bottom))
+        body = body.removeSplitter()
+
+    return body, {
+        "Lead": lead,
+        "LeadAngle": math.degrees(math.atan(lead / (2 * math.pi * pitch_radius))),
+    }
+
+
+class Worm(Feature):
+    shape = staticmethod(worm_shape)
+
+    def __init__(self, obj):
+        obj.Proxy = self
+        obj.addProperty("App::PropertyQuantity", "Starts").Starts = 1
+        obj.addProperty("App::PropertyLength", "Module").Module = 2
+        obj.addProperty("App::PropertyLength", "PitchDiameter").PitchDiameter = 20
+        obj.addProperty("App::PropertyLength", "Length").Length = 30
+        obj.addProperty("App::PropertyBool", "LeftHanded").LeftHanded = False
+        obj.addProperty("App::PropertyAngle", "PressureAngle").PressureAngle = 20
+        obj.addProperty("App::PropertyQuantity", "BacklashFactor").BacklashFactor = 0
+        obj.addProperty("App::PropertyQuantity", "DedendumFactor").DedendumFactor = 1.25
+        obj.addProperty("App::PropertyQuantity", "AddendumFactor").AddendumFactor = 1
+        obj.addProperty(
+            "App::PropertyQuantity", "ProfileShiftFactor"
+        ).ProfileShiftFactor = 0
+        obj.addProperty("App::PropertyLength", "Lead")
+        obj.setEditorMode("Lead", 1)
+        # the helix angle of the mating Gear
+        obj.addProperty("App::PropertyAngle", "LeadAngle")
+        obj.setEditorMode("LeadAngle", 1)
+
+
+def make_worm():
+    obj = App.ActiveDocument.addObject("Part::FeaturePython", "Worm")
+    Worm(obj)
+    obj.ViewObject.Proxy = 0
+    App.ActiveDocument.recompute()